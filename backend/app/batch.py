@@ -0,0 +1,121 @@
+from collections import Counter
+from fastapi import HTTPException
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Sequence
+
+from . import models
+from .cache import cache
+from .crud import check_not_null
+from .versioning import touch_cours
+
+# Nombre maximum d'opérations par liste (create / update / delete) d'un lot
+MAX_BATCH_ITEMS = 500
+
+
+def _dedupe(ids: Sequence[int]) -> List[int]:
+    return list(dict.fromkeys(ids))
+
+
+def _existing(db: Session, model, ids: Sequence[int]) -> Dict[int, int]:
+    """id -> id_cours des lignes existantes parmi `ids`"""
+    if not ids:
+        return {}
+    rows = db.execute(select(model.id, model.id_cours).where(model.id.in_(ids))).all()
+    return {row.id: row.id_cours for row in rows}
+
+
+def _create(db: Session, model, items: List[Dict[str, Any]], counts: Counter) -> List[Dict[str, Any]]:
+    cours_ids = {item["id_cours"] for item in items}
+    found = set(db.execute(select(models.Cours.id).where(models.Cours.id.in_(cours_ids))).scalars())
+    missing = sorted(cours_ids - found)
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Cours introuvables : {', '.join(map(str, missing))}")
+
+    # Objets ORM : le flush renvoie les id générés (un INSERT par ligne sous MySQL)
+    objects = [model(**item) for item in items]
+    db.add_all(objects)
+    db.flush()
+    counts.update(obj.id_cours for obj in objects)
+    return [{"index": i, "id": obj.id, "status": "created"} for i, obj in enumerate(objects)]
+
+
+def _update(db: Session, model, items: List[Dict[str, Any]], touched: set) -> List[Dict[str, Any]]:
+    found = _existing(db, model, _dedupe([item["id"] for item in items]))
+
+    # Une seule requête : SET col = CASE id WHEN :id THEN :valeur ... ELSE col END
+    values_by_column: Dict[str, Dict[int, Any]] = {}
+    for item in items:
+        if item["id"] in found:
+            for key, value in item.items():
+                if key != "id":
+                    values_by_column.setdefault(key, {})[item["id"]] = value
+
+    if values_by_column:
+        column_ids = {id_ for values in values_by_column.values() for id_ in values}
+        db.execute(
+            update(model)
+            .where(model.id.in_(column_ids))
+            .values({
+                key: case(values, value=model.id, else_=getattr(model, key))
+                for key, values in values_by_column.items()
+            })
+            .execution_options(synchronize_session=False)
+        )
+    touched.update(found.values())
+    return [{"id": item["id"], "status": "updated" if item["id"] in found else "not_found"} for item in items]
+
+
+def _delete(db: Session, model, ids: List[int], counts: Counter) -> List[Dict[str, Any]]:
+    ids = _dedupe(ids)
+    found = _existing(db, model, ids)
+    if found:
+        db.execute(
+            delete(model)
+            .where(model.id.in_(list(found)))
+            .execution_options(synchronize_session=False)
+        )
+    counts.subtract(found.values())
+    return [{"id": id_, "status": "deleted" if id_ in found else "not_found"} for id_ in ids]
+
+
+def apply_batch(
+    db: Session,
+    model,
+    counter: str,
+    create: Sequence[Dict[str, Any]] = (),
+    update_items: Sequence[Dict[str, Any]] = (),
+    delete_ids: Sequence[int] = (),
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Applique un lot de créations, modifications et suppressions sur une table fille de `cours`
+    dans une seule transaction, avec des requêtes ensemblistes (UPDATE / DELETE ... WHERE id IN).
+    Les compteurs `counter` des cours concernés sont mis à jour, le cache invalidé après commit.
+    Retourne le résultat de chaque opération (created / updated / deleted / not_found).
+    """
+    for name, items in (("create", create), ("update", update_items), ("delete", delete_ids)):
+        if len(items) > MAX_BATCH_ITEMS:
+            raise HTTPException(status_code=400, detail=f"Trop d'opérations \"{name}\" (maximum {MAX_BATCH_ITEMS})")
+    for i, item in enumerate(update_items):
+        check_not_null(model, item, f"update[{i}] : ")
+
+    counts: Counter = Counter()
+    touched: set = set()
+    result = {"created": [], "updated": [], "deleted": []}
+
+    if create:
+        result["created"] = _create(db, model, list(create), counts)
+    if update_items:
+        result["updated"] = _update(db, model, list(update_items), touched)
+    if delete_ids:
+        result["deleted"] = _delete(db, model, list(delete_ids), counts)
+
+    touched.update(counts)
+    for cours_id in sorted(touched):
+        delta = counts.get(cours_id, 0)
+        touch_cours(db, cours_id, **({counter: delta} if delta else {}))
+    db.commit()
+
+    if touched:
+        cache.invalidate("cours", *[f"cours:{cours_id}" for cours_id in touched])
+    return result
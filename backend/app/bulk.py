@@ -0,0 +1,120 @@
+from collections import Counter
+from itertools import islice
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import hashlib
+import os
+
+# Lignes par lot de upsert_rows : une recherche, un INSERT et un UPDATE (surchargeable via l'environnement)
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+
+
+# Lignes importées des tables filles de `cours` : colonnes qui identifient une ligne dans son cours
+# (avec son rang parmi les lignes de même valeur, empreinte `row_key`) et colonnes importées
+# (empreinte `content_hash`)
+UPSERT_COLUMNS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    "page": (("description",), ("description", "content", "medias")),
+    "qcm": (("question",), ("question", "rep1", "rep2", "rep3", "rep4", "soluce")),
+    "text_a_trou": (("texte",), ("texte", "reponse1", "reponse2", "reponse3", "reponse4", "soluce")),
+    "jeu_classement": (
+        ("question",),
+        ("question", "element1", "element2", "element3", "element4", "ordre_solution", "type_elements"),
+    ),
+}
+
+
+def _digest(values: Iterable[Any]) -> str:
+    text = "\x1f".join("" if value is None else str(value) for value in values)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RowHasher:
+    """
+    Empreintes (row_key, content_hash) des lignes successives d'un fichier (ou d'un cours,
+    dans l'ordre des id). La clé d'une ligne combine ses colonnes d'identité et son rang
+    parmi les lignes qui partagent ces valeurs : deux pages « Exemple » ou deux questions
+    identiques restent deux lignes distinctes, et un réimport retrouve chacune d'elles.
+    """
+
+    def __init__(self, table: str):
+        self.key, self.content = UPSERT_COLUMNS[table]
+        self._seen: Counter = Counter()
+
+    def __call__(self, values: Dict[str, Any]) -> Tuple[str, str]:
+        content_hash = _digest(values.get(name) for name in self.content)
+        # Clé vide (page sans titre) : la ligne est identifiée par tout son contenu
+        if any(values.get(name) for name in self.key):
+            identity = _digest(values.get(name) for name in self.key)
+        else:
+            identity = content_hash
+        rank = self._seen[identity]
+        self._seen[identity] += 1
+        return _digest((identity, rank)), content_hash
+
+
+def upsert_rows(
+    db: Session,
+    model,
+    rows: Iterable[Dict[str, Any]],
+    cours_id: int,
+    batch_size: Optional[int] = None,
+    on_batch: Optional[Callable[[Dict[str, int]], None]] = None,
+) -> Dict[str, int]:
+    """
+    Importe des lignes validées dans une table fille de `cours`, lot par lot : une seule
+    requête indexée par lot (id_cours, row_key) retrouve les lignes existantes, puis les
+    nouvelles sont insérées (`executemany`), les modifiées mises à jour et les identiques
+    ignorées. Les clés d'un même fichier sont toutes distinctes (voir RowHasher) : aucune
+    ligne du fichier n'en remplace une autre.
+    Retourne les totaux `inserted`, `updated` et `skipped` ; `on_batch` reçoit ceux de
+    chaque lot. Le commit reste à la charge de l'appelant.
+    """
+    size = batch_size or IMPORT_BATCH_SIZE
+    table = model.__table__
+    hasher = RowHasher(table.name)
+    insert_statement = insert(table)
+    # Colonnes du SET données par les clés des paramètres (executemany)
+    update_statement = update(table).where(table.c.id == bindparam("b_id"))
+    iterator = iter(rows)
+    totals = {"inserted": 0, "updated": 0, "skipped": 0}
+
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            break
+
+        for values in batch:
+            values["row_key"], values["content_hash"] = hasher(values)
+
+        existing = {
+            row.row_key: row
+            for row in db.execute(
+                select(table.c.id, table.c.row_key, table.c.content_hash)
+                .where(table.c.id_cours == cours_id, table.c.row_key.in_([values["row_key"] for values in batch]))
+            )
+        }
+
+        inserts, updates, skipped = [], [], 0
+        for values in batch:
+            row = existing.get(values["row_key"])
+            if row is None:
+                inserts.append(values)
+            elif row.content_hash == values["content_hash"]:
+                skipped += 1
+            else:
+                updates.append({"b_id": row.id, "content_hash": values["content_hash"],
+                                **{name: values[name] for name in hasher.content}})
+
+        if inserts:
+            db.execute(insert_statement, inserts)
+        if updates:
+            db.execute(update_statement, updates)
+        counts = {"inserted": len(inserts), "updated": len(updates), "skipped": skipped}
+
+        for name, count in counts.items():
+            totals[name] += count
+        if on_batch is not None:
+            on_batch(counts)
+
+    return totals
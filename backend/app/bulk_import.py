@@ -0,0 +1,398 @@
+"""
+Import groupé : plusieurs cours et leurs activités en une requête (ZIP et/ou CSV multiples).
+
+Le type de chaque CSV est donné par son dossier (`qcm/`, `text_a_trou/` ou `tat/`,
+`jeu_classement/` ou `jeu/`) ou par son suffixe (`histoire.qcm.csv`, `histoire.tat.csv`,
+`histoire.jeu.csv`) ; les autres fichiers sont des cours. Une activité est rattachée
+au cours dont le titre figure sur sa première ligne (comme pour les imports unitaires) :
+d'abord parmi les cours du lot, sinon parmi les cours existants.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fastapi import HTTPException, UploadFile
+from sqlalchemy import select
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+import logging
+import os
+import posixpath
+import shutil
+import tempfile
+import threading
+import zipfile
+
+from . import models
+from .cache import cache
+from .csv_stream import detect_encoding, iter_csv_rows
+from .database import SessionLocal
+from .importer import IMPORT_SPECS, MAX_REPORTED_ERRORS, CsvImportError, ImportStats, import_cours_csv, import_csv
+from .jobs import ImportJob, invalidate_after_commit, run_import_file, submit_task
+from .module_lookup import resolve_module, titre_key
+from .versioning import touch_cours
+
+logger = logging.getLogger(__name__)
+
+# Fichiers importés en parallèle par un import groupé
+BULK_IMPORT_WORKERS = int(os.getenv("BULK_IMPORT_WORKERS", "4"))
+# Nombre maximum de CSV et taille totale décompressée d'un import groupé
+BULK_MAX_FILES = 2000
+BULK_MAX_BYTES = int(os.getenv("BULK_IMPORT_MAX_MB", "512")) * 1024 * 1024
+# Erreurs de ligne reprises par fichier dans le rapport
+MAX_FILE_ERRORS = 10
+
+COURS = "cours"
+# Dossier ou suffixe -> type d'activité (nom du RowSpec enregistré)
+KIND_ALIASES = {
+    "qcm": "qcm",
+    "text_a_trou": "text_a_trou",
+    "tat": "text_a_trou",
+    "jeu_classement": "jeu_classement",
+    "jeu": "jeu_classement",
+}
+# Encodages essayés pour lire le titre d'un cours (comme import_cours_csv)
+COURS_ENCODINGS = ["utf-8-sig", "utf-8", "windows-1252", "latin-1"]
+
+
+@dataclass
+class BulkFile:
+    name: str
+    path: str
+    kind: str
+    titre: Optional[str] = None
+    # Module de l'en-tête d'un cours : (titre, description ou None)
+    module: Optional[Tuple[str, Optional[str]]] = None
+    status: str = "pending"  # pending | done | failed
+    cours_id: Optional[int] = None
+    # Fichier de cours : False si un cours existant a été réutilisé
+    created: bool = False
+    detail: Optional[str] = None
+    stats: ImportStats = field(default_factory=ImportStats)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "file": self.name,
+            "type": self.kind,
+            "titre": self.titre,
+            "status": self.status,
+            "cours_id": self.cours_id,
+            "rows_parsed": self.stats.rows_parsed,
+            "rows_inserted": self.stats.rows_inserted,
+            "rows_updated": self.stats.rows_updated,
+            "rows_skipped": self.stats.rows_skipped,
+            "rows_rejected": self.stats.rows_rejected,
+            "errors": self.stats.errors[:MAX_FILE_ERRORS],
+            "detail": self.detail,
+        }
+
+
+def file_kind(name: str) -> str:
+    """Type d'un CSV d'après son dossier ou son suffixe (`cours` par défaut)"""
+    parts = name.lower().split("/")
+    stem = parts[-1][:-len(".csv")]
+    candidates = parts[:-1] + ([stem.rsplit(".", 1)[1]] if "." in stem else [])
+    for candidate in reversed(candidates):
+        if candidate in KIND_ALIASES:
+            return KIND_ALIASES[candidate]
+    return COURS
+
+
+# ==================== RÉCEPTION DES FICHIERS ====================
+
+class _Spool:
+    """Copie des CSV reçus dans un dossier temporaire, avec limites de nombre et de taille"""
+
+    def __init__(self):
+        self.dir = tempfile.mkdtemp(prefix="bulk-import-")
+        self.files: List[BulkFile] = []
+        self.ignored: List[str] = []
+        self.size = 0
+
+    def add(self, name: str, source: BinaryIO) -> None:
+        if len(self.files) >= BULK_MAX_FILES:
+            raise HTTPException(status_code=400, detail=f"Trop de fichiers (maximum {BULK_MAX_FILES})")
+
+        path = os.path.join(self.dir, f"{len(self.files):05d}.csv")
+        with open(path, "wb") as out:
+            while True:
+                chunk = source.read(64 * 1024)
+                if not chunk:
+                    break
+                self.size += len(chunk)
+                if self.size > BULK_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Import trop volumineux (maximum {BULK_MAX_BYTES // (1024 * 1024)} Mo)")
+                out.write(chunk)
+        self.files.append(BulkFile(name=name, path=path, kind=file_kind(name)))
+
+    def add_zip(self, upload: UploadFile) -> None:
+        # Archive copiée sur disque avant lecture : zipfile a besoin d'un fichier réel
+        # (le SpooledTemporaryFile de l'upload n'a pas de seekable() avant Python 3.11)
+        path = os.path.join(self.dir, f"archive-{len(self.files):05d}.zip")
+        with open(path, "wb") as out:
+            shutil.copyfileobj(upload.file, out)
+        try:
+            archive = zipfile.ZipFile(path)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail=f"{upload.filename} n'est pas une archive ZIP valide")
+
+        try:
+            with archive:
+                for member in archive.infolist():
+                    name = member.filename
+                    if member.is_dir() or name.startswith("__MACOSX/") or posixpath.basename(name).startswith("."):
+                        continue
+                    if not name.lower().endswith(".csv"):
+                        self.ignored.append(f"{upload.filename}:{name}")
+                        continue
+                    with archive.open(member) as source:
+                        self.add(name, source)
+        finally:
+            os.remove(path)
+
+    def cleanup(self) -> None:
+        shutil.rmtree(self.dir, ignore_errors=True)
+
+
+def spool_uploads(uploads: List[UploadFile]) -> _Spool:
+    """Copie les ZIP et CSV reçus sur disque. Bloquant : à appeler depuis un handler synchrone."""
+    spool = _Spool()
+    try:
+        for upload in uploads:
+            filename = upload.filename or ""
+            upload.file.seek(0)
+            if filename.lower().endswith(".zip"):
+                spool.add_zip(upload)
+            elif filename.lower().endswith(".csv"):
+                spool.add(filename, upload.file)
+            else:
+                raise HTTPException(status_code=400, detail=f"{filename} : seuls les fichiers .zip et .csv sont acceptés")
+        if not spool.files:
+            raise HTTPException(status_code=400, detail="Aucun fichier CSV à importer")
+    except Exception:
+        spool.cleanup()
+        raise
+    return spool
+
+
+# ==================== IMPORT ====================
+
+def _first_row(path: str, encoding: str, skip_comments: bool) -> List[str]:
+    """Première ligne non vide (lignes `#` ignorées pour les activités, comme import_csv)"""
+    with open(path, "rb") as f:
+        for row in iter_csv_rows(f, encoding, delimiter=";"):
+            cells = [cell.strip() for cell in row]
+            if any(cells) and not (skip_comments and cells[0].startswith("#")):
+                return cells
+    return []
+
+
+def _read_title(item: BulkFile) -> None:
+    """Titre du cours : première colonne de l'en-tête d'un cours, première ligne d'une activité"""
+    try:
+        if item.kind == COURS:
+            with open(item.path, "rb") as f:
+                encoding = detect_encoding(f, COURS_ENCODINGS)
+            row = _first_row(item.path, encoding, skip_comments=False) if encoding else []
+        else:
+            row = _first_row(item.path, "utf-8-sig", skip_comments=True)
+    except UnicodeDecodeError:
+        row = []
+
+    if item.kind == COURS:
+        # Les erreurs d'en-tête sont signalées par import_cours_csv
+        item.titre = row[0] if row else ""
+        if len(row) >= 3 and row[2]:
+            item.module = (row[2], row[3] if len(row) >= 4 and row[3] else None)
+        return
+    cells = [cell for cell in row if cell]
+    if len(cells) != 1:
+        item.status, item.detail = "failed", "La première ligne doit contenir le titre du cours"
+    else:
+        item.titre = cells[0]
+
+
+class _BulkRun:
+    def __init__(self, job: ImportJob, files: List[BulkFile]):
+        self.job = job
+        self.files = files
+        self._lock = threading.Lock()
+
+    def _record(self, item: BulkFile) -> None:
+        # Compteurs globaux du job, consultables pendant l'import
+        with self._lock:
+            stats = self.job.stats
+            stats.rows_parsed += item.stats.rows_parsed
+            stats.rows_inserted += item.stats.rows_inserted
+            stats.rows_updated += item.stats.rows_updated
+            stats.rows_skipped += item.stats.rows_skipped
+            stats.rows_rejected += item.stats.rows_rejected
+            stats.reasons.update(item.stats.reasons)
+
+    def _import(self, item: BulkFile, runner, invalidate: Tuple[str, ...]) -> None:
+        try:
+            run_import_file(item.path, runner, item.stats, invalidate)
+            item.status = "done"
+        except CsvImportError as e:
+            item.status, item.detail = "failed", str(e)
+        except Exception as e:
+            logger.error(f"Erreur import groupé {self.job.id} ({item.name})", exc_info=True)
+            item.status, item.detail = "failed", f"Erreur inattendue: {str(e)}"
+        self._record(item)
+
+    def _import_cours(self, item: BulkFile) -> None:
+        def runner(db, fileobj, stats):
+            db_cours, item.created = import_cours_csv(db, fileobj, stats=stats)
+            item.cours_id = db_cours.id
+            if not item.created:
+                invalidate_after_commit(db, f"cours:{db_cours.id}")
+            return {}
+
+        self._import(item, runner, ("cours", "modules"))
+        if item.status != "done":
+            item.cours_id = None
+
+    def _import_activities(self, items: List[BulkFile]) -> None:
+        # Fichiers d'un même cours importés l'un après l'autre : chacun met à jour les compteurs
+        # du cours, deux transactions parallèles sur la même ligne risqueraient un deadlock
+        for item in items:
+            spec = IMPORT_SPECS[item.kind]
+
+            def runner(db, fileobj, stats, spec=spec, cours_id=item.cours_id):
+                details = import_csv(db, spec, fileobj, cours_id, stats)
+                if details["questions_added"] or details["questions_updated"]:
+                    touch_cours(db, cours_id, **{f"nb_{spec.name}": details["questions_added"]})
+                return details
+
+            self._import(item, runner, ("cours", f"cours:{item.cours_id}"))
+
+    def _link(self, activities: List[BulkFile], cours_files: List[BulkFile]) -> None:
+        """Rattache chaque activité à un cours du lot, sinon à un cours existant de même titre"""
+        in_batch = {titre_key(item.titre): item for item in cours_files}
+
+        unresolved = []
+        for item in activities:
+            cours = in_batch.get(titre_key(item.titre))
+            if cours is None:
+                unresolved.append(item)
+            elif cours.cours_id is None:
+                item.status, item.detail = "failed", f"Le cours \"{item.titre}\" de ce lot n'a pas été importé"
+            else:
+                item.cours_id = cours.cours_id
+
+        if unresolved:
+            db = SessionLocal()
+            try:
+                rows = db.execute(
+                    select(models.Cours.id, models.Cours.titre)
+                    .where(models.Cours.titre.in_({item.titre for item in unresolved}))
+                ).all()
+            finally:
+                db.close()
+            existing: Dict[str, List[int]] = {}
+            for row in rows:
+                existing.setdefault(titre_key(row.titre), []).append(row.id)
+
+            for item in unresolved:
+                ids = existing.get(titre_key(item.titre), [])
+                if len(ids) == 1:
+                    item.cours_id = ids[0]
+                else:
+                    problem = "introuvable" if not ids else f"ambigu ({len(ids)} cours portent ce titre)"
+                    item.status, item.detail = "failed", f"Cours \"{item.titre}\" {problem}"
+
+    def _create_modules(self, cours_files: List[BulkFile]) -> None:
+        """
+        Crée en une transaction les modules décrits dans les en-têtes du lot, avant les imports
+        parallèles : un cours peut citer sans description un module décrit par un autre fichier.
+        """
+        described = {}
+        for item in cours_files:
+            if item.module and item.module[1]:
+                described.setdefault(titre_key(item.module[0]), item.module)
+        if not described:
+            return
+
+        db = SessionLocal()
+        try:
+            for name, description in described.values():
+                resolve_module(db, name, description)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+        cache.invalidate("modules")
+
+    def run(self) -> Dict[str, Any]:
+        for item in self.files:
+            _read_title(item)
+
+        cours_files = []
+        seen = set()
+        for item in self.files:
+            if item.kind != COURS or item.status == "failed":
+                continue
+            key = titre_key(item.titre)
+            if key and key in seen:
+                item.status, item.detail = "failed", f"Titre \"{item.titre}\" en double dans ce lot"
+                continue
+            seen.add(key)
+            cours_files.append(item)
+
+        self._create_modules(cours_files)
+
+        with ThreadPoolExecutor(max_workers=BULK_IMPORT_WORKERS, thread_name_prefix="bulk-import") as pool:
+            # 1. Cours et pages, en parallèle (modules déjà en cache)
+            list(pool.map(self._import_cours, cours_files))
+
+            # 2. Activités, en parallèle par cours
+            activities = [item for item in self.files if item.kind != COURS and item.status != "failed"]
+            self._link(activities, cours_files)
+            by_cours: Dict[int, List[BulkFile]] = {}
+            for item in activities:
+                if item.cours_id is not None and item.status != "failed":
+                    by_cours.setdefault(item.cours_id, []).append(item)
+            list(pool.map(self._import_activities, by_cours.values()))
+
+        failed = [item for item in self.files if item.status == "failed"]
+        self.job.stats.errors.extend({"file": item.name, "error": item.detail} for item in failed[:MAX_REPORTED_ERRORS])
+        return self.report()
+
+    def report(self) -> Dict[str, Any]:
+        counts: Dict[str, Dict[str, int]] = {"inserted": {}, "updated": {}, "skipped": {}}
+        for item in self.files:
+            table = "page" if item.kind == COURS else item.kind
+            for name, count in (("inserted", item.stats.rows_inserted), ("updated", item.stats.rows_updated),
+                                ("skipped", item.stats.rows_skipped)):
+                counts[name][table] = counts[name].get(table, 0) + count
+        cours_done = [item for item in self.files if item.kind == COURS and item.status == "done"]
+        return {
+            "files": len(self.files),
+            "done": sum(1 for item in self.files if item.status == "done"),
+            "failed": sum(1 for item in self.files if item.status == "failed"),
+            "cours_created": [{"id": item.cours_id, "titre": item.titre} for item in cours_done if item.created],
+            "cours_reused": [{"id": item.cours_id, "titre": item.titre} for item in cours_done if not item.created],
+            "rows_inserted": counts["inserted"],
+            "rows_updated": counts["updated"],
+            "rows_skipped": counts["skipped"],
+            "details": [item.report() for item in self.files],
+        }
+
+
+def submit_bulk_import(uploads: List[UploadFile]) -> ImportJob:
+    """
+    Copie les fichiers reçus sur disque et programme l'import groupé sur le pool de workers.
+    Chaque CSV est importé dans sa propre transaction : un fichier en échec n'annule pas les autres.
+    Bloquant (copie) : à appeler depuis un handler synchrone.
+    """
+    spool = spool_uploads(uploads)
+
+    def task(job: ImportJob) -> Dict[str, Any]:
+        try:
+            report = _BulkRun(job, spool.files).run()
+        finally:
+            spool.cleanup()
+        if spool.ignored:
+            report["ignored"] = spool.ignored
+        return report
+
+    return submit_task("bulk", task)
@@ -0,0 +1,185 @@
+from collections import OrderedDict
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# memory (défaut) | redis | none
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory").lower()
+# Durée de vie (s) d'une réponse en cache
+CACHE_TTL = int(os.getenv("CACHE_TTL", "60"))
+# Nombre maximum de réponses gardées par processus (backend mémoire)
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "2048"))
+# URL du serveur Redis (backend redis, partagé entre workers)
+CACHE_URL = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+
+# Tag implicite de toutes les entrées : l'incrémenter vide tout le cache
+ALL = "all"
+
+
+class MemoryBackend:
+    """Cache LRU + TTL local au processus"""
+    blocking = False
+
+    def __init__(self, max_entries: int):
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, tags: Sequence[str]) -> List[int]:
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags: Sequence[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Cache partagé entre workers (nécessite le paquet `redis`)"""
+    blocking = True
+
+    def __init__(self, url: str, prefix: str = "factoscope:cache:"):
+        import redis  # dépendance optionnelle
+
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def get(self, key: str) -> Optional[Any]:
+        raw = self._redis.get(self._prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._redis.set(self._prefix + key, json.dumps(value, default=str), ex=ttl)
+
+    def versions(self, tags: Sequence[str]) -> List[int]:
+        raw = self._redis.mget([self._prefix + "v:" + tag for tag in tags])
+        return [int(v) if v is not None else 0 for v in raw]
+
+    def bump(self, tags: Sequence[str]) -> None:
+        pipe = self._redis.pipeline()
+        for tag in tags:
+            pipe.incr(self._prefix + "v:" + tag)
+        pipe.execute()
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+class ResponseCache:
+    """
+    Cache de lecture des routes du catalogue.
+    Chaque entrée est rattachée à des tags (ex: "cours", "cours:12") dont la
+    version fait partie de la clé : invalider un tag, c'est incrémenter sa version,
+    les anciennes entrées ne sont plus jamais lues et expirent d'elles-mêmes.
+    """
+
+    def __init__(self, backend, ttl: int):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def _call(self, method, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(method, *args)
+        return method(*args)
+
+    async def cached(
+        self,
+        route: str,
+        params: Dict[str, Any],
+        tags: Sequence[str],
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """Renvoie la réponse en cache, ou l'obtient via `loader` (valeur JSON-compatible)"""
+        if self.backend is None:
+            return await loader()
+
+        tags = [ALL, *tags]
+        try:
+            versions = await self._call(self.backend.versions, tags)
+            key = route + "?" + "&".join(f"{k}={params[k]}" for k in sorted(params))
+            key += "#" + ",".join(f"{tag}={v}" for tag, v in zip(tags, versions))
+            value = await self._call(self.backend.get, key)
+        except Exception:
+            # Un cache indisponible ne doit pas rendre l'API indisponible
+            self.errors += 1
+            logger.warning("Cache indisponible en lecture", exc_info=True)
+            return await loader()
+
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = await loader()
+        try:
+            await self._call(self.backend.set, key, value, self.ttl)
+        except Exception:
+            self.errors += 1
+            logger.warning("Cache indisponible en écriture", exc_info=True)
+        return value
+
+    def invalidate(self, *tags: str) -> None:
+        """À appeler après le commit d'une écriture"""
+        if self.backend is None or not tags:
+            return
+        try:
+            self.backend.bump(tags)
+        except Exception:
+            self.errors += 1
+            logger.warning("Invalidation du cache impossible", exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": CACHE_BACKEND,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": self.backend.size() if self.backend is not None else 0,
+        }
+
+
+def _build_backend():
+    if CACHE_BACKEND == "none":
+        return None
+    if CACHE_BACKEND == "redis":
+        return RedisBackend(CACHE_URL)
+    return MemoryBackend(CACHE_MAX_ENTRIES)
+
+
+cache = ResponseCache(_build_backend(), CACHE_TTL)
@@ -0,0 +1,85 @@
+from fastapi import HTTPException
+from sqlalchemy import delete, exists, select, update
+from sqlalchemy.orm import Session
+from typing import Any, Dict, Optional
+
+from .models import public_columns
+
+
+def _dialect(db: Session):
+    return db.get_bind().dialect
+
+
+def get_row(db: Session, model, row_id: int) -> Optional[Dict[str, Any]]:
+    """Colonnes d'une ligne sous forme de dict (sans objet ORM), ou None"""
+    row = db.execute(select(*public_columns(model)).where(model.id == row_id)).first()
+    return dict(row._mapping) if row else None
+
+
+def check_not_null(model, values: Dict[str, Any], prefix: str = "") -> None:
+    """`null` explicite sur une colonne NOT NULL : 400 avant toute écriture (sinon IntegrityError)"""
+    columns = model.__table__.c
+    nulls = [key for key, value in values.items() if value is None and key in columns and not columns[key].nullable]
+    if nulls:
+        raise HTTPException(status_code=400, detail=f"{prefix}{', '.join(nulls)} ne peut pas être null")
+
+
+def check_foreign_keys(db: Session, model, values: Dict[str, Any]) -> None:
+    """Clé étrangère vers une ligne inexistante : 400 avant toute écriture (sinon IntegrityError)"""
+    columns = model.__table__.c
+    for key, value in values.items():
+        if value is None or key not in columns:
+            continue
+        for foreign_key in columns[key].foreign_keys:
+            target = foreign_key.column
+            if not db.execute(select(exists().where(target == value))).scalar():
+                raise HTTPException(status_code=400, detail=f"{key} : {target.table.name} {value} introuvable")
+
+
+def update_by_id(db: Session, model, row_id: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Modifie une ligne par un seul `UPDATE ... WHERE id = :id`, sans la charger au préalable.
+    Renvoie la ligne modifiée (RETURNING si la base le permet, sinon un SELECT),
+    ou None si elle n'existe pas. Ne fait pas de commit.
+    Un `null` sur une colonne NOT NULL ou une clé étrangère inconnue donne une 400,
+    comme dans les lots (batch.apply_batch).
+    """
+    if not values:
+        return get_row(db, model, row_id)
+    check_not_null(model, values)
+    check_foreign_keys(db, model, values)
+
+    statement = update(model.__table__).where(model.id == row_id).values(values)
+    if _dialect(db).update_returning:
+        row = db.execute(statement.returning(*public_columns(model))).first()
+        return dict(row._mapping) if row else None
+
+    # Le dialecte MySQL compte les lignes trouvées (FOUND_ROWS), même inchangées
+    if db.execute(statement).rowcount == 0:
+        return None
+    return get_row(db, model, row_id)
+
+
+def delete_by_id(db: Session, model, row_id: int) -> bool:
+    """
+    Supprime une ligne par un seul `DELETE ... WHERE id = :id`. Les lignes dépendantes
+    sont supprimées par la base (ON DELETE CASCADE), sans être chargées par l'ORM.
+    Renvoie False si la ligne n'existe pas. Ne fait pas de commit.
+    """
+    return db.execute(delete(model.__table__).where(model.id == row_id)).rowcount > 0
+
+
+def delete_child_by_id(db: Session, model, row_id: int) -> Optional[int]:
+    """
+    Supprime une ligne d'une table fille de `cours` sans la charger en objet ORM.
+    Renvoie son id_cours, ou None si elle n'existe pas. Ne fait pas de commit.
+    """
+    statement = delete(model.__table__).where(model.id == row_id)
+    if _dialect(db).delete_returning:
+        row = db.execute(statement.returning(model.id_cours)).first()
+        return row[0] if row else None
+
+    cours_id = db.execute(select(model.id_cours).where(model.id == row_id)).scalar()
+    if cours_id is not None:
+        db.execute(statement)
+    return cours_id
@@ -0,0 +1,66 @@
+from typing import BinaryIO, Iterator, List, Optional, Sequence
+import codecs
+import csv
+import re
+
+# Taille des blocs lus depuis le fichier uploadé
+READ_CHUNK_SIZE = 64 * 1024
+
+
+# Une ligne et sa fin de ligne : "\r\n", "\n" ou "\r" seul (anciens Mac, certains exports Excel)
+_LINE = re.compile(r"[^\r\n]*(?:\r\n|\r|\n)")
+
+
+def _iter_lines(fileobj: BinaryIO, encoding: str) -> Iterator[str]:
+    """Décode le fichier bloc par bloc et renvoie ses lignes (fin de ligne incluse)"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    pending = ""
+
+    while True:
+        chunk = fileobj.read(READ_CHUNK_SIZE)
+        pending += decoder.decode(chunk, final=not chunk)
+        if not chunk:
+            break
+
+        # Un "\r" final peut être le début d'un "\r\n" à cheval sur deux blocs : il attend le bloc suivant
+        end = max(pending.rfind("\n"), pending.rfind("\r", 0, len(pending) - 1)) + 1
+        if end:
+            yield from _LINE.findall(pending, 0, end)
+            pending = pending[end:]
+
+    end = max(pending.rfind("\n"), pending.rfind("\r")) + 1
+    yield from _LINE.findall(pending, 0, end)
+    if pending[end:]:
+        yield pending[end:]
+
+
+def detect_encoding(fileobj: BinaryIO, encodings: Sequence[str]) -> Optional[str]:
+    """
+    Premier encodage de la liste capable de décoder tout le fichier.
+    Le fichier est parcouru par blocs, sans être chargé en mémoire.
+    """
+    for encoding in encodings:
+        fileobj.seek(0)
+        try:
+            decoder = codecs.getincrementaldecoder(encoding)()
+            while True:
+                chunk = fileobj.read(READ_CHUNK_SIZE)
+                decoder.decode(chunk, final=not chunk)
+                if not chunk:
+                    break
+        except (UnicodeDecodeError, LookupError):
+            continue
+        fileobj.seek(0)
+        return encoding
+
+    fileobj.seek(0)
+    return None
+
+
+def iter_csv_rows(fileobj: BinaryIO, encoding: str = "utf-8-sig", **reader_kwargs) -> Iterator[List[str]]:
+    """
+    Lit un CSV en flux depuis un fichier binaire (ex: `UploadFile.file`).
+    Une erreur de décodage lève `UnicodeDecodeError` au moment où la ligne fautive est lue.
+    """
+    fileobj.seek(0)
+    return csv.reader(_iter_lines(fileobj, encoding), **reader_kwargs)
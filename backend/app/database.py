@@ -1,38 +1,58 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
+from typing import Optional
+import asyncio
+import logging
 import os
 import pymysql
 pymysql.install_as_MySQLdb() 
 import time
-from sqlalchemy.exc import OperationalError
+
+from .logging_config import install_slow_query_logging
+from .pool_metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool
 # Charger les variables d'environnement
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # URL de connexion à la base de données
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Créer le moteur SQLAlchemy avec retry pour attendre MySQL
-engine = None
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL n'est pas défini dans les variables d'environnement")
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
 
-for attempt in range(30):
-    try:
-        engine = create_engine(DATABASE_URL, echo=True, pool_pre_ping=True)
-        # Test d'une connexion immédiate pour valider la disponibilité
-        with engine.connect() as conn:
-            pass
-        break
-    except Exception as e:
-        time.sleep(2)
-else:
-    # Si aucune connexion n'a réussi après les tentatives, lever l'erreur
-    raise OperationalError(f"Impossible de se connecter à la base de données après plusieurs tentatives: {DATABASE_URL}", None, None)
-
-# Créer une session locale
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Dimensionnement du pool de connexions (par processus) : à ajuster selon
+# le nombre de workers et le max_connections de MySQL
+POOL_OPTIONS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+    # Recycler les connexions avant le wait_timeout de MySQL
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    # Requête de test à chaque checkout (un aller-retour de plus par requête) : désactivée
+    # par défaut, la base est testée périodiquement par le moniteur de santé (health.py)
+    "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", "0"),
+}
+
+# Attente de la base au démarrage (lifespan) : durée maximale et délai maximal entre deux essais
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "60"))
+DB_CONNECT_MAX_DELAY = 5.0
+
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # Les suppressions reposent sur ON DELETE CASCADE : SQLite (développement)
+    # n'applique les clés étrangères que si on le lui demande
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+# Moteurs créés à la demande par init_engines() (lifespan de l'API, migrations, seed) :
+# importer l'application n'ouvre aucune connexion et n'exige pas de base
+engine: Optional[Engine] = None
+
+# Créer une session locale (liée au moteur par init_engines)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 # Base pour les modèles
 Base = declarative_base()
@@ -44,3 +64,135 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# ==================== MODE ASYNCHRONE (optionnel) ====================
+
+# DB_ASYNC=1 : les routes de lecture utilisent une AsyncSession (driver aiomysql),
+# les écritures restent sur le moteur synchrone ci-dessus.
+DB_ASYNC = _env_bool("DB_ASYNC", "0")
+
+# Drivers asynchrones utilisés si ASYNC_DATABASE_URL n'est pas défini
+ASYNC_DRIVERS = {"mysql": "mysql+aiomysql", "sqlite": "sqlite+aiosqlite"}
+
+def _async_url(url: str):
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    if driver is None:
+        raise RuntimeError(f"Pas de driver asynchrone connu pour {parsed.get_backend_name()}, définissez ASYNC_DATABASE_URL")
+    return parsed.set(drivername=driver)
+
+async_engine = None
+AsyncSessionLocal = None
+
+def _create_async_engine():
+    global async_engine, AsyncSessionLocal
+    # Import local : sqlalchemy.ext.asyncio exige greenlet, inutile en mode synchrone
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        os.getenv("ASYNC_DATABASE_URL") or _async_url(DATABASE_URL),
+        poolclass=InstrumentedAsyncQueuePool,
+        **POOL_OPTIONS,
+    )
+    install_slow_query_logging(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+def init_engines() -> Engine:
+    """
+    Crée les moteurs (sans se connecter) et lie SessionLocal au moteur synchrone.
+    Sans effet si c'est déjà fait. Retourne le moteur synchrone.
+    """
+    global engine
+    if engine is not None:
+        return engine
+    if not DATABASE_URL:
+        raise RuntimeError("DATABASE_URL n'est pas défini dans les variables d'environnement")
+
+    engine = create_engine(DATABASE_URL, poolclass=InstrumentedQueuePool, **POOL_OPTIONS)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _enable_sqlite_foreign_keys)
+    install_slow_query_logging(engine)
+    SessionLocal.configure(bind=engine)
+
+    if DB_ASYNC:
+        _create_async_engine()
+    return engine
+
+def ping() -> None:
+    """Requête de test sur le moteur synchrone (bloquante)"""
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+async def wait_for_database(timeout: float = DB_CONNECT_TIMEOUT) -> None:
+    """
+    Attend que la base accepte les connexions, avec un délai croissant entre les essais
+    (0,5 s, 1 s, 2 s... plafonné à DB_CONNECT_MAX_DELAY). Lève l'erreur de connexion
+    si la base n'est pas joignable après `timeout` secondes.
+    """
+    init_engines()
+    deadline = time.monotonic() + timeout
+    delay = 0.5
+    attempt = 1
+    while True:
+        try:
+            await run_in_threadpool(ping)
+            return
+        except Exception as e:
+            if time.monotonic() + delay > deadline:
+                logger.error(f"Base de données injoignable après {attempt} tentative(s)")
+                raise
+            logger.warning(f"Base de données indisponible (tentative {attempt}) : {e}")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, DB_CONNECT_MAX_DELAY)
+            attempt += 1
+
+async def dispose_engines() -> None:
+    """Ferme les connexions des pools (arrêt de l'API)"""
+    global engine, async_engine, AsyncSessionLocal
+    if async_engine is not None:
+        await async_engine.dispose()
+        async_engine = AsyncSessionLocal = None
+    if engine is not None:
+        engine.dispose()
+        engine = None
+
+# Session des routes de lecture : AsyncSession en mode asynchrone, Session sinon
+async def get_read_db():
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as session:
+            yield session
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+async def _execute(db, statement):
+    # Session synchrone : la requête part dans le threadpool pour ne pas bloquer la boucle
+    if isinstance(db, Session):
+        return await run_in_threadpool(lambda: db.execute(statement).all())
+    return (await db.execute(statement)).all()
+
+async def fetch_all(db, statement):
+    """Lignes d'un SELECT, quel que soit le type de session"""
+    return await _execute(db, statement)
+
+async def fetch_objects(db, statement):
+    """Objets ORM d'un select(Model)"""
+    return [row[0] for row in await _execute(db, statement)]
+
+async def fetch_object(db, statement):
+    """Premier objet ORM d'un select(Model), ou None"""
+    objects = await fetch_objects(db, statement.limit(1))
+    return objects[0] if objects else None
+
+def pool_status():
+    """Statistiques des pools de connexions (voir GET /api/metrics/pool)"""
+    if engine is None:
+        return {}
+    status = {"sync": engine.pool.metrics.snapshot(engine.pool)}
+    if async_engine is not None:
+        pool = async_engine.sync_engine.pool
+        status["async"] = pool.metrics.snapshot(pool)
+    return status
@@ -0,0 +1,136 @@
+from datetime import date, datetime
+from sqlalchemy import select
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+import csv
+import io
+import json
+
+from . import models
+from .database import SessionLocal
+from .importer import IMPORT_SPECS
+
+# Lignes lues par aller-retour sur le curseur côté serveur
+EXPORT_FETCH_SIZE = 1000
+# Taille approximative des morceaux envoyés au client
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# Tables exportables (segment d'URL -> modèle)
+EXPORT_TABLES = {
+    "modules": models.Module,
+    "cours": models.Cours,
+    "pages": models.Page,
+    "qcm": models.QCM,
+    "text_a_trou": models.TextATrou,
+    "jeu_classement": models.JeuClassement,
+}
+
+
+def stream_rows(statement) -> Iterator[Dict[str, Any]]:
+    """
+    Lignes d'un SELECT lues par un curseur côté serveur (`stream_results`), par paquets de
+    EXPORT_FETCH_SIZE : la mémoire ne dépend pas du nombre de lignes. La session est propre
+    au générateur (la réponse est envoyée après la fin du handler) et fermée à la fin.
+    """
+    db = SessionLocal()
+    try:
+        result = db.execute(statement.execution_options(stream_results=True, yield_per=EXPORT_FETCH_SIZE))
+        for row in result:
+            yield dict(row._mapping)
+    finally:
+        db.close()
+
+
+def _chunks(lines: Iterable[str]) -> Iterator[bytes]:
+    """Regroupe les lignes en morceaux d'environ EXPORT_CHUNK_SIZE octets"""
+    buffer: List[str] = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_SIZE:
+            yield "".join(buffer).encode("utf-8")
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} non sérialisable")
+
+
+def ndjson_stream(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Un objet JSON par ligne"""
+    return _chunks(json.dumps(row, default=_json_default, ensure_ascii=False) + "\n" for row in rows)
+
+
+def csv_stream(records: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """Lignes CSV séparées par `;`, comme les fichiers acceptés par les imports"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=";", lineterminator="\n")
+
+    def lines() -> Iterator[str]:
+        for record in records:
+            writer.writerow(["" if value is None else value for value in record])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    return _chunks(lines())
+
+
+def table_statement(model, cours_id: Optional[int] = None):
+    """Toutes les colonnes d'une table, par id croissant (filtrées par cours si demandé)"""
+    statement = select(*models.public_columns(model)).order_by(model.id)
+    if cours_id is not None:
+        statement = statement.where((model.id if model is models.Cours else model.id_cours) == cours_id)
+    return statement
+
+
+def table_csv(model, rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Sauvegarde CSV d'une table : ligne d'en-tête avec les noms de colonnes, puis les lignes"""
+    columns = [c.key for c in models.public_columns(model)]
+
+    def records():
+        yield columns
+        for row in rows:
+            yield [row[name] for name in columns]
+
+    return csv_stream(records())
+
+
+# ==================== FORMAT DES IMPORTS ====================
+
+def cours_import_csv(cours: models.Cours, module: Optional[models.Module]) -> Iterator[bytes]:
+    """
+    CSV d'un cours au format de POST /api/cours/upload :
+    en-tête `titre;description;module;description_module` (`titre;description;;` sans module),
+    puis `description;contenu;medias` par page.
+    """
+    def records():
+        yield [cours.titre, cours.description, module.titre if module else "", module.description if module else ""]
+        for page in stream_rows(
+            select(models.Page.description, models.Page.content, models.Page.medias)
+            .where(models.Page.id_cours == cours.id)
+            .order_by(models.Page.id)
+        ):
+            yield [page["description"], page["content"], page["medias"]]
+
+    return csv_stream(records())
+
+
+def activity_import_csv(kind: str, cours: models.Cours) -> Iterator[bytes]:
+    """
+    CSV des activités `kind` d'un cours au format de POST /api/{type}/upload/{cours_id} :
+    titre du cours en première ligne, puis les colonnes du RowSpec de l'import, dans l'ordre.
+    """
+    spec = IMPORT_SPECS[kind]
+    columns = [spec.model.__table__.c[field.name] for field in spec.fields]
+
+    def records():
+        yield [cours.titre, ""]
+        for row in stream_rows(select(*columns).where(spec.model.id_cours == cours.id).order_by(spec.model.id)):
+            yield [row[field.name] for field in spec.fields]
+
+    return csv_stream(records())
@@ -0,0 +1,117 @@
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, Optional
+import asyncio
+import logging
+import os
+import time
+
+from . import database
+from .jobs import backlog
+
+logger = logging.getLogger(__name__)
+
+# Intervalle (s) entre deux tests de la base
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "10"))
+# Au-delà de cette part de connexions prises (pool + overflow), le worker n'est plus prêt
+READY_MAX_POOL_UTILIZATION = float(os.getenv("READY_MAX_POOL_UTILIZATION", "0.9"))
+# Au-delà de ce nombre d'imports en attente, le worker n'est plus prêt
+READY_MAX_IMPORT_BACKLOG = int(os.getenv("READY_MAX_IMPORT_BACKLOG", "20"))
+
+
+class DatabaseHealth:
+    """
+    Test périodique de la base en tâche de fond : GET /readyz lit le dernier résultat
+    sans ouvrir de connexion. Un test en échec sur une connexion coupée invalide le pool
+    (SQLAlchemy), ce qui remplace le test à chaque checkout (pool_pre_ping).
+    """
+
+    def __init__(self, interval: float = HEALTH_CHECK_INTERVAL):
+        self.interval = interval
+        self.ok = False
+        self.latency_ms: Optional[float] = None
+        self.error: Optional[str] = None
+        self.checked_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def check(self) -> None:
+        start = time.perf_counter()
+        try:
+            await run_in_threadpool(database.ping)
+        except Exception as e:
+            if self.ok:
+                logger.warning(f"Base de données indisponible : {e}")
+            self.ok, self.latency_ms, self.error = False, None, str(e)
+        else:
+            if not self.ok and self.checked_at is not None:
+                logger.info("Base de données de nouveau disponible")
+            self.ok, self.error = True, None
+            self.latency_ms = round((time.perf_counter() - start) * 1000, 3)
+        self.checked_at = time.time()
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.check()
+
+    async def start(self) -> None:
+        """Premier test immédiat, puis un test toutes les `interval` secondes"""
+        await self.check()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        # Un résultat trop ancien (boucle bloquée ou arrêtée) ne prouve plus rien
+        stale = self.checked_at is None or time.time() - self.checked_at > 3 * self.interval
+        return {
+            "ok": self.ok and not stale,
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at,
+            "error": "résultat périmé" if stale and self.ok else self.error,
+        }
+
+
+db_health = DatabaseHealth()
+
+
+def _pool_utilization(pools: Dict[str, Dict[str, Any]]) -> float:
+    """Part maximale de connexions prises parmi les pools (0 à 1)"""
+    ratios = [
+        pool["checked_out"] / (pool["size"] + pool["max_overflow"])
+        for pool in pools.values()
+        if pool["size"] + pool["max_overflow"] > 0
+    ]
+    return round(max(ratios, default=0.0), 3)
+
+
+def readiness() -> Dict[str, Any]:
+    """État du worker pour GET /readyz : base, pool de connexions et imports en attente"""
+    db = db_health.status()
+    pools = database.pool_status()
+    utilization = _pool_utilization(pools)
+    jobs = backlog()
+
+    checks = {
+        "database": db["ok"],
+        "pool": utilization < READY_MAX_POOL_UTILIZATION,
+        "imports": jobs["pending"] <= READY_MAX_IMPORT_BACKLOG,
+    }
+    return {
+        "status": "ok" if all(checks.values()) else "unavailable",
+        "checks": checks,
+        "database": db,
+        "pool": {
+            "utilization": utilization,
+            "max_utilization": READY_MAX_POOL_UTILIZATION,
+            **{name: {key: pool[key] for key in ("size", "max_overflow", "checked_out", "timeouts")}
+               for name, pool in pools.items()},
+        },
+        "imports": {**jobs, "max_pending": READY_MAX_IMPORT_BACKLOG},
+    }
@@ -0,0 +1,306 @@
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import chain
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import models
+from .bulk import upsert_rows
+from .csv_stream import detect_encoding, iter_csv_rows
+from .module_lookup import resolve_module
+from .versioning import touch_cours
+
+
+# Nombre maximum d'erreurs de ligne conservées dans un rapport d'import
+MAX_REPORTED_ERRORS = 100
+
+
+class CsvImportError(Exception):
+    """Fichier rejeté dans son ensemble (vide, mal encodé, aucune ligne valide)"""
+
+
+class RowError(ValueError):
+    """Ligne rejetée ; le message donne la raison"""
+
+
+@dataclass(frozen=True)
+class CsvField:
+    """Une colonne du CSV, dans l'ordre du fichier"""
+    name: str                                    # colonne du modèle cible
+    parse: Callable[[str], Any] = str            # conversion de la cellule (int, str.lower, ...)
+    validate: Optional[Callable[[Any], bool]] = None
+    error: str = ""                              # message si `validate` échoue
+
+    def convert(self, cell: str) -> Any:
+        try:
+            value = self.parse(cell)
+        except ValueError:
+            raise RowError(f"{self.name} invalide: {cell}")
+        if self.validate is not None and not self.validate(value):
+            raise RowError(self.error or f"{self.name} invalide: {cell}")
+        return value
+
+
+@dataclass(frozen=True)
+class RowSpec:
+    """Description déclarative d'un type d'activité importable en CSV"""
+    name: str
+    model: Any
+    fields: Tuple[CsvField, ...]
+
+    @property
+    def width(self) -> int:
+        return len(self.fields)
+
+    def parse_row(self, row: List[str]) -> Dict[str, Any]:
+        """Nettoie, convertit et valide une ligne en une seule passe"""
+        # Les colonnes en trop (ex: ';' final) sont ignorées
+        if len(row) < self.width:
+            raise RowError(f"moins de {self.width} colonnes")
+
+        values = {}
+        for column, cell in zip(self.fields, row):
+            cell = cell.strip() if cell else ""
+            if not cell:
+                raise RowError("champs manquants")
+            values[column.name] = column.convert(cell)
+        return values
+
+
+@dataclass
+class ImportStats:
+    """Compteurs d'un import, mis à jour au fil de la lecture (suivi de progression)"""
+    rows_parsed: int = 0
+    rows_inserted: int = 0
+    rows_updated: int = 0
+    rows_skipped: int = 0
+    rows_rejected: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    reasons: Counter = field(default_factory=Counter)
+
+    def reject(self, line: int, reason: str) -> None:
+        self.rows_rejected += 1
+        # Motif sans la valeur fautive, pour regrouper les rejets dans le résumé
+        self.reasons[reason.split(":")[0]] += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": reason})
+
+    def summary(self) -> str:
+        """Résumé d'une ligne, journalisé à la fin de l'import"""
+        text = (
+            f"{self.rows_parsed} lignes lues, {self.rows_inserted} insérées, {self.rows_updated} modifiées, "
+            f"{self.rows_skipped} inchangées, {self.rows_rejected} rejetées"
+        )
+        if self.reasons:
+            text += " (" + ", ".join(f"{reason}: {count}" for reason, count in self.reasons.most_common(5)) + ")"
+        return text
+
+    def upserted(self, counts: Dict[str, int]) -> None:
+        self.rows_inserted += counts["inserted"]
+        self.rows_updated += counts["updated"]
+        self.rows_skipped += counts["skipped"]
+
+
+# Types d'activités enregistrés (voir routes/)
+IMPORT_SPECS: Dict[str, RowSpec] = {}
+
+
+def register(spec: RowSpec) -> RowSpec:
+    IMPORT_SPECS[spec.name] = spec
+    return spec
+
+
+def _is_data_line(row: List[str]) -> bool:
+    # ignorer lignes vides / commentaires
+    if not any(cell.strip() for cell in row):
+        return False
+    return not row[0].strip().startswith("#")
+
+
+def _is_header_line(row: List[str]) -> bool:
+    # Format: "Titre_cours_relie_au_jeu;"
+    # => une seule colonne non vide
+    return sum(1 for cell in row if cell.strip()) == 1
+
+
+def import_csv(
+    db: Session,
+    spec: RowSpec,
+    fileobj: BinaryIO,
+    cours_id: int,
+    stats: Optional[ImportStats] = None,
+    encoding: str = "utf-8-sig",
+) -> Dict[str, int]:
+    """
+    Importe un CSV d'activité pour un cours : lecture en flux, validation ligne
+    à ligne selon `spec` et upsert par lots (les lignes déjà importées à l'identique
+    sont ignorées, voir bulk.upsert_rows). Ne fait pas de commit.
+    """
+    stats = stats if stats is not None else ImportStats()
+    reader = iter_csv_rows(fileobj, encoding, delimiter=";", skipinitialspace=True)
+    rows = (row for row in reader if _is_data_line(row))
+
+    try:
+        first = next(rows, None)
+        if first is None:
+            raise CsvImportError("Le fichier est vide")
+
+        # Si première ligne = titre, on la saute
+        start_idx = 1 if _is_header_line(first) else 0
+        data_rows = rows if start_idx else chain([first], rows)
+
+        def valid_rows() -> Iterator[Dict[str, Any]]:
+            for i, row in enumerate(data_rows, start=start_idx + 1):
+                stats.rows_parsed += 1
+                try:
+                    values = spec.parse_row(row)
+                except RowError as e:
+                    stats.reject(i, str(e))
+                    continue
+                values["id_cours"] = cours_id
+                yield values
+
+        counts = upsert_rows(db, spec.model, valid_rows(), cours_id, on_batch=stats.upserted)
+    except UnicodeDecodeError:
+        raise CsvImportError("Le fichier doit être encodé en UTF-8")
+
+    if not any(counts.values()):
+        raise CsvImportError("Aucune ligne valide trouvée dans le fichier")
+
+    return {
+        "total_rows": start_idx + stats.rows_parsed,
+        "data_rows": stats.rows_parsed,
+        "valid_rows": stats.rows_parsed - stats.rows_rejected,
+        "questions_added": counts["inserted"],
+        "questions_updated": counts["updated"],
+        "questions_skipped": counts["skipped"],
+        "invalid_rows": stats.rows_rejected,
+    }
+
+
+def _clean(x: Optional[str]) -> str:
+    return (x or "").strip()
+
+
+def import_cours_csv(
+    db: Session,
+    fileobj: BinaryIO,
+    titre: Optional[str] = None,
+    description: Optional[str] = None,
+    thematique: Optional[str] = None,
+    stats: Optional[ImportStats] = None,
+) -> Tuple[models.Cours, bool]:
+    """
+    Importe un cours et ses pages depuis un CSV (en-tête : titre; description; module[; description_module]).
+    Les champs de formulaire, s'ils sont fournis, remplacent l'en-tête. Un cours de même titre et de même
+    module est réutilisé : ses pages sont mises à jour par upsert au lieu d'être dupliquées.
+    Retourne le cours et True s'il a été créé. Ne fait pas de commit.
+    """
+    stats = stats if stats is not None else ImportStats()
+
+    # Détection de l'encodage par lecture en flux (le fichier n'est pas chargé en mémoire)
+    encoding = detect_encoding(fileobj, ['utf-8-sig', 'utf-8', 'windows-1252', 'latin-1'])
+    if encoding is None:
+        raise CsvImportError("Impossible de décoder le fichier CSV. Sauvegardez-le en UTF-8 et réessayez.")
+
+    reader = iter_csv_rows(fileobj, encoding, delimiter=';')
+    rows = (row for row in reader if any(_clean(c) for c in row))
+
+    first_row = next(rows, None)
+    if first_row is None:
+        raise CsvImportError("CSV vide")
+
+    is_form_mode = any([_clean(titre), _clean(description), _clean(thematique)])
+
+    first = [_clean(c) for c in first_row]
+    # `titre;description;;` (exactement 4 colonnes, module vide) : cours sans module,
+    # tel qu'écrit par GET /api/export/cours/{id}
+    without_module = len(first) == 4 and first[0] and not first[2] and not first[3]
+    csv_has_header = (len(first) >= 3 and first[0] and first[2]) or without_module
+
+    if is_form_mode:
+        course_title = _clean(titre)
+        course_description = _clean(description)
+        module_name = _clean(thematique)
+        module_description = None
+    else:
+        if not csv_has_header:
+            raise CsvImportError(
+                "CSV invalide : l'en-tête doit contenir au moins 3 colonnes (titre; description; module), "
+                "ou `titre; description; ;` pour un cours sans module"
+            )
+        course_title = first[0]
+        course_description = first[1] if len(first) >= 2 else ""
+        module_name = first[2]
+        module_description = first[3] if len(first) >= 4 else None
+
+    # Résolution ou création du module (sans accents ni casse), dans la transaction du cours
+    id_module = None
+    if module_name:
+        id_module = resolve_module(db, module_name, module_description or None)
+        if id_module is None:
+            raise CsvImportError(
+                f"Le module \"{module_name}\" n'existe pas en base de données. "
+                f"Pour le créer automatiquement, ajoutez sa description en 4ème colonne de l'en-tête de votre CSV : "
+                f"titre; description_cours; {module_name}; description_du_module"
+            )
+
+    # Cours déjà importé (même titre, même module) : mis à jour, ses pages sont fusionnées
+    db_cours = db.execute(
+        select(models.Cours)
+        .where(models.Cours.titre == course_title, models.Cours.id_module == id_module)
+        .order_by(models.Cours.id)
+        .limit(1)
+    ).scalar()
+    created = db_cours is None
+    if created:
+        # Module, cours et pages sont écrits dans une seule transaction
+        db_cours = models.Cours(
+            titre=course_title,
+            description=course_description,
+            contenu=course_description,
+            id_module=id_module
+        )
+        db.add(db_cours)
+        db.flush()
+    changed = db_cours.description != course_description
+    if changed:
+        db_cours.description = db_cours.contenu = course_description
+
+    def page_rows() -> Iterator[Dict[str, Any]]:
+        for row in rows:
+            stats.rows_parsed += 1
+            row = [_clean(c) for c in row[:3]]
+            description = row[0] if len(row) >= 1 else ""
+            content = row[1] if len(row) >= 2 else ""
+            medias = row[2] if len(row) >= 3 else ""
+
+            if not description and not content and not medias:
+                continue
+
+            yield {
+                "description": description,
+                "content": content,
+                "medias": medias,
+                "est_vue": 0,
+                "id_cours": db_cours.id,
+            }
+
+    # Les pages sont validées et écrites lot par lot pendant la lecture
+    try:
+        counts = upsert_rows(db, models.Page, page_rows(), db_cours.id, on_batch=stats.upserted)
+    except UnicodeDecodeError:
+        raise CsvImportError("Impossible de décoder le fichier CSV. Sauvegardez-le en UTF-8 et réessayez.")
+
+    if not any(counts.values()):
+        raise CsvImportError("Aucune page valide trouvée dans le CSV")
+
+    if created:
+        db_cours.nb_pages = counts["inserted"]
+    elif changed or counts["inserted"] or counts["updated"]:
+        db.flush()
+        touch_cours(db, db_cours.id, nb_pages=counts["inserted"])
+        db.refresh(db_cours)
+
+    return db_cours, created
@@ -0,0 +1,181 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+from typing import Any, BinaryIO, Callable, Dict, Optional, Sequence
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+from .cache import cache
+from .database import SessionLocal
+from .importer import CsvImportError, ImportStats
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'imports traités en parallèle par processus
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", "2"))
+# Nombre de jobs terminés conservés pour consultation
+MAX_FINISHED_JOBS = 500
+
+# Fonction d'import exécutée par le worker : (session, fichier, compteurs) -> résultat
+ImportRunner = Callable[[Session, BinaryIO, ImportStats], Dict[str, Any]]
+# Clé de session.info des tags de cache ajoutés pendant l'import
+_CACHE_TAGS = "cache_tags"
+
+
+@dataclass
+class ImportJob:
+    id: str
+    kind: str
+    status: str = "pending"  # pending | running | done | failed
+    stats: ImportStats = field(default_factory=ImportStats)
+    result: Optional[Dict[str, Any]] = None
+    detail: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "rows_parsed": self.stats.rows_parsed,
+            "rows_inserted": self.stats.rows_inserted,
+            "rows_updated": self.stats.rows_updated,
+            "rows_skipped": self.stats.rows_skipped,
+            "rows_rejected": self.stats.rows_rejected,
+            "errors": list(self.stats.errors),
+            "result": self.result,
+            "detail": self.detail,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+_jobs: Dict[str, ImportJob] = {}
+_lock = threading.Lock()
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="import")
+        return _executor
+
+
+def _prune_finished() -> None:
+    # Appelé sous verrou : on oublie les jobs terminés les plus anciens
+    finished = [job for job in _jobs.values() if job.finished_at is not None]
+    if len(finished) <= MAX_FINISHED_JOBS:
+        return
+    finished.sort(key=lambda job: job.finished_at)
+    for job in finished[:len(finished) - MAX_FINISHED_JOBS]:
+        del _jobs[job.id]
+
+
+def get_job(job_id: str) -> Optional[ImportJob]:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def backlog() -> Dict[str, int]:
+    """Nombre de jobs en attente et en cours (voir GET /readyz)"""
+    with _lock:
+        statuses = [job.status for job in _jobs.values()]
+    return {"pending": statuses.count("pending"), "running": statuses.count("running")}
+
+
+def spool_upload(upload: UploadFile, suffix: str = ".csv") -> str:
+    """
+    Copie un fichier uploadé sur disque (il est fermé à la fin de la requête) et retourne
+    son chemin. La copie est bloquante : à appeler depuis un handler synchrone.
+    """
+    with tempfile.NamedTemporaryFile(prefix="import-", suffix=suffix, delete=False) as tmp:
+        upload.file.seek(0)
+        shutil.copyfileobj(upload.file, tmp)
+        return tmp.name
+
+
+def invalidate_after_commit(db: Session, *tags: str) -> None:
+    """Tags connus pendant l'import (ex: cours existant réutilisé), invalidés par run_import_file"""
+    db.info.setdefault(_CACHE_TAGS, set()).update(tags)
+
+
+def run_import_file(path: str, runner: ImportRunner, stats: ImportStats, invalidate: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Importe un fichier dans sa propre session et sa propre transaction, puis invalide
+    les tags `invalidate` du cache de lecture (et ceux ajoutés par le runner avec
+    invalidate_after_commit) après le commit. Les erreurs sont propagées après rollback.
+    """
+    db = SessionLocal()
+    try:
+        with open(path, "rb") as f:
+            result = runner(db, f, stats)
+        db.commit()
+        cache.invalidate(*invalidate, *db.info.pop(_CACHE_TAGS, ()))
+        return result
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def submit_task(kind: str, task: Callable[[ImportJob], Dict[str, Any]]) -> ImportJob:
+    """
+    Programme `task(job)` sur le pool de workers et retourne le job immédiatement.
+    Le résultat de `task` devient `job.result` ; une CsvImportError fait échouer
+    le job avec son message.
+    """
+    job = ImportJob(id=uuid.uuid4().hex, kind=kind)
+    with _lock:
+        _prune_finished()
+        _jobs[job.id] = job
+
+    _get_executor().submit(_run, job, task)
+    return job
+
+
+def submit_import(kind: str, upload: UploadFile, runner: ImportRunner, invalidate: Sequence[str] = ()) -> ImportJob:
+    """
+    Copie le fichier uploadé sur disque et programme son import sur le pool de workers.
+    Retourne immédiatement. Les tags `invalidate` du cache de lecture sont invalidés
+    après le commit. La copie est bloquante : à appeler depuis un handler synchrone.
+    """
+    path = spool_upload(upload)
+
+    def task(job: ImportJob) -> Dict[str, Any]:
+        try:
+            return run_import_file(path, runner, job.stats, invalidate)
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    return submit_task(kind, task)
+
+
+def _run(job: ImportJob, task: Callable[[ImportJob], Dict[str, Any]]) -> None:
+    job.status = "running"
+    try:
+        job.result = task(job)
+        job.status = "done"
+    except CsvImportError as e:
+        job.detail = str(e)
+        job.status = "failed"
+    except Exception as e:
+        logger.error(f"Erreur import {job.kind} ({job.id})", exc_info=True)
+        job.detail = f"Erreur inattendue: {str(e)}"
+        job.status = "failed"
+    finally:
+        job.finished_at = time.time()
+        # Une seule ligne de log par import, rejets agrégés par motif
+        logger.info(f"Import {job.kind} {job.id} {job.status} : {job.stats.summary()}")
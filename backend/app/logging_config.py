@@ -0,0 +1,58 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import logging
+import os
+import random
+import time
+
+# Niveau global des logs de l'application
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# DB_ECHO=1 : journaliser toutes les requêtes SQL (développement uniquement)
+DB_ECHO = os.getenv("DB_ECHO", "0").lower() in ("1", "true", "yes")
+# Requêtes plus lentes que ce seuil (ms) journalisées, 0 pour désactiver
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "500"))
+# Proportion des requêtes lentes effectivement journalisées (0.0 à 1.0)
+SLOW_QUERY_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_SAMPLE_RATE", "1.0"))
+
+slow_query_logger = logging.getLogger("app.sql.slow")
+
+
+def configure_logging() -> None:
+    """Configure les logs de l'application selon l'environnement"""
+    logging.basicConfig(
+        level=LOG_LEVEL,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    # Les requêtes SQL ne sont journalisées qu'à la demande : à fort trafic,
+    # l'écriture des logs coûterait plus cher que les requêtes elles-mêmes
+    logging.getLogger("sqlalchemy.engine").setLevel(logging.INFO if DB_ECHO else logging.WARNING)
+
+
+def install_slow_query_logging(engine: Engine) -> None:
+    """Journalise (par échantillonnage) les requêtes dépassant SLOW_QUERY_MS"""
+    if SLOW_QUERY_MS <= 0 or SLOW_QUERY_SAMPLE_RATE <= 0:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _log_slow_query(conn, cursor, statement, parameters, context, executemany):
+        elapsed_ms = (time.perf_counter() - conn.info["query_start"].pop()) * 1000
+        if elapsed_ms < SLOW_QUERY_MS or random.random() >= SLOW_QUERY_SAMPLE_RATE:
+            return
+        # Les paramètres ne sont pas journalisés (contenu des cours, volume)
+        slow_query_logger.warning(
+            "Requête lente (%.1f ms%s) : %s",
+            elapsed_ms,
+            ", executemany" if executemany else "",
+            " ".join(statement.split())[:500],
+        )
+
+    @event.listens_for(engine, "handle_error")
+    def _drop_timer(context):
+        # Requête en erreur : after_cursor_execute n'est pas appelé
+        starts = context.connection.info.get("query_start") if context.connection is not None else None
+        if starts:
+            starts.pop()
@@ -1,23 +1,45 @@
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request, Response
 from fastapi import UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
 from typing import List, Optional
-import csv
-import io
 import os
 
 # Import des routeurs
-from .routes import text_a_trou, qcm, jeu_classement
+from .routes import text_a_trou, qcm, jeu_classement, imports, metrics, health, search, export
 
 from . import models, schemas
-from .database import engine, get_db
-
-# Créer les tables si elles n'existent pas déjà (ne modifie pas les données existantes)
-models.Base.metadata.create_all(bind=engine)
-
-app = FastAPI()
+from .logging_config import configure_logging
+from .cache import ALL, cache
+from .health import db_health
+from .database import get_db, get_read_db, fetch_object, dispose_engines, wait_for_database
+from .pagination import PaginationParams, paginate
+from .importer import ImportStats, import_cours_csv
+from .batch import apply_batch
+from .crud import delete_by_id, delete_child_by_id, update_by_id
+from .jobs import invalidate_after_commit, submit_import
+from .bulk_import import submit_bulk_import
+from .module_lookup import module_ids, titre_key
+from .versioning import touch_cours, touch_values, conditional_get
+
+# Le schéma est géré par les migrations : `python -m app.migrate` avant le démarrage
+
+configure_logging()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Connexion à la base au démarrage du worker, pas à l'import du module
+    await wait_for_database()
+    await db_health.start()
+    yield
+    await db_health.stop()
+    await dispose_engines()
+
+app = FastAPI(lifespan=lifespan)
 
 # Configuration CORS pour permettre les requêtes du frontend
 app.add_middleware(
@@ -26,6 +48,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lu par les clients pour les requêtes conditionnelles (If-None-Match)
+    expose_headers=["ETag"],
 )
 
 # Modèle pour les données de connexion
@@ -57,18 +81,48 @@ def login(credentials: LoginRequest):
 
 # ==================== ROUTES COURS ====================
 
-@app.get("/api/cours", response_model=List[schemas.Cours])
-def get_cours(db: Session = Depends(get_db)):
-    """Récupérer tous les cours"""
-    return db.query(models.Cours).all()
+@app.get("/api/cours", response_model=schemas.PaginatedResponse)
+async def get_cours(params: PaginationParams = Depends(), db=Depends(get_read_db)):
+    """Récupérer les cours (paginés)"""
+    return await cache.cached("cours", vars(params), ["cours"], lambda: paginate(db, models.Cours, params))
 
 @app.get("/api/cours/{cours_id}", response_model=schemas.Cours)
-def get_cours_by_id(cours_id: int, db: Session = Depends(get_db)):
+async def get_cours_by_id(cours_id: int, request: Request, response: Response, db=Depends(get_read_db)):
     """Récupérer un cours par son ID"""
-    cours = db.query(models.Cours).filter(models.Cours.id == cours_id).first()
-    if not cours:
-        raise HTTPException(status_code=404, detail="Cours non trouvé")
-    return cours
+    async def load():
+        cours = await fetch_object(db, select(models.Cours).where(models.Cours.id == cours_id))
+        if not cours:
+            raise HTTPException(status_code=404, detail="Cours non trouvé")
+        return schemas.Cours.model_validate(cours).model_dump()
+
+    return await conditional_get(
+        request, response, db, "cours", cours_id, None,
+        lambda version: cache.cached("cours_detail", {"id": cours_id, "version": version}, [f"cours:{cours_id}"], load),
+    )
+
+@app.get("/api/cours/{cours_id}/bundle", response_model=schemas.CoursBundle)
+async def get_cours_bundle(cours_id: int, db=Depends(get_read_db)):
+    """Récupérer un cours avec son module, ses pages et toutes ses activités"""
+    async def load():
+        # Une requête par relation (selectinload) : nombre de requêtes SQL fixe
+        cours = await fetch_object(
+            db,
+            select(models.Cours)
+            .options(
+                selectinload(models.Cours.module),
+                selectinload(models.Cours.pages),
+                selectinload(models.Cours.qcms),
+                selectinload(models.Cours.text_a_trou),
+                selectinload(models.Cours.jeux_classement),
+            )
+            .where(models.Cours.id == cours_id)
+        )
+        if not cours:
+            raise HTTPException(status_code=404, detail="Cours non trouvé")
+        return schemas.CoursBundle.model_validate(cours).model_dump()
+
+    # Le bundle embarque le module : il dépend aussi des modifications de modules
+    return await cache.cached("cours_bundle", {"id": cours_id}, [f"cours:{cours_id}", "modules"], load)
 
 @app.post("/api/cours", response_model=schemas.Cours)
 def create_cours(cours: schemas.CoursCreate, db: Session = Depends(get_db)):
@@ -76,214 +130,157 @@ def create_cours(cours: schemas.CoursCreate, db: Session = Depends(get_db)):
     db_cours = models.Cours(**cours.dict())
     db.add(db_cours)
     db.commit()
+    cache.invalidate("cours")
     db.refresh(db_cours)
     return db_cours
 
-from fastapi import UploadFile, File, Depends, HTTPException, Form
-from sqlalchemy.orm import Session
-import csv, io
-
-@app.post("/api/cours/upload", response_model=schemas.Cours)
-async def upload_cours_csv(
+# Handlers d'upload synchrones (def) : FastAPI les exécute dans son threadpool,
+# la copie du fichier et les requêtes SQL ne bloquent pas la boucle d'événements
+@app.post("/api/cours/upload", status_code=202)
+def upload_cours_csv(
     file: UploadFile = File(...),
     titre: str = Form(None),
     description: str = Form(None),
     thematique: str = Form(None),
-    db: Session = Depends(get_db),
 ):
-    def clean(x):
-        return (x or "").strip()
-
-    raw = await file.read()
-
-    for encoding in ['utf-8-sig', 'utf-8', 'windows-1252', 'latin-1']:
-        try:
-            text = raw.decode(encoding)
-            break
-        except (UnicodeDecodeError, LookupError):
-            continue
-    else:
-        raise HTTPException(400, "Impossible de décoder le fichier CSV. Sauvegardez-le en UTF-8 et réessayez.")
-
-    reader = csv.reader(io.StringIO(text), delimiter=';')
-    rows = [row for row in reader if any(clean(c) for c in row)]
-
-    if not rows:
-        raise HTTPException(400, "CSV vide")
-
-    is_form_mode = any([clean(titre), clean(description), clean(thematique)])
-
-    first = [clean(c) for c in rows[0]]
-    csv_has_header = len(first) >= 3 and first[0] and first[2]
-    
-    if is_form_mode:
-        course_title = clean(titre)
-        course_description = clean(description)
-        module_name = clean(thematique)
-        module_description = None 
-        data_rows = rows[1:]
-    else:
-        if not csv_has_header:
-            raise HTTPException(
-                400,
-                "CSV invalide : l'en-tête doit contenir au moins 3 colonnes (titre; description; module)"
-            )
-        course_title = first[0]
-        course_description = first[1] if len(first) >= 2 else ""
-        module_name = first[2]
-        module_description = first[3] if len(first) >= 4 else None
-        data_rows = rows[1:]
-
-    # Résolution ou création du module
-    id_module = None
-    if module_name:
-        db_module = db.query(models.Module).filter(
-            models.Module.titre == module_name
-        ).first()
-
-        if db_module:
-            id_module = db_module.id
-
-        elif module_description:
-            db_module = models.Module(
-                titre=module_name,
-                description=module_description,
-            )
-            db.add(db_module)
-            db.commit()
-            db.refresh(db_module)
-            id_module = db_module.id
-
-        else:
-            raise HTTPException(
-                400,
-                f"Le module \"{module_name}\" n'existe pas en base de données. "
-                f"Pour le créer automatiquement, ajoutez sa description en 4ème colonne de l'en-tête de votre CSV : "
-                f"titre; description_cours; {module_name}; description_du_module"
-            )
-
-    db_cours = models.Cours(
-        titre=course_title,
-        description=course_description,
-        contenu=course_description,
-        id_module=id_module
-    )
-    db.add(db_cours)
-    db.commit()
-    db.refresh(db_cours)
-
-    created_pages = 0
-
-    for row in data_rows:
-        row = [clean(c) for c in row]
-        description = row[0] if len(row) >= 1 else ""
-        content = row[1] if len(row) >= 2 else ""
-        medias = row[2] if len(row) >= 3 else ""
-
-        if not description and not content and not medias:
-            continue
+    """
+    Importer un cours et ses pages depuis un CSV. Un cours de même titre et de même module
+    est réutilisé : pages ajoutées, modifiées ou ignorées si inchangées (`created` vaut false).
+    L'import est exécuté en arrière-plan : suivre sa progression via GET /api/imports/{job_id}.
+    """
+    def run(db: Session, fileobj, stats: ImportStats):
+        db_cours, created = import_cours_csv(db, fileobj, titre, description, thematique, stats)
+        if not created:
+            invalidate_after_commit(db, f"cours:{db_cours.id}")
+        return {**schemas.Cours.model_validate(db_cours).model_dump(), "created": created}
+
+    # Le cours, ses pages et éventuellement son module sont créés ou mis à jour
+    job = submit_import("cours", file, run, invalidate=("cours", "modules"))
+    return job.to_dict()
+
+@app.post("/api/cours/bulk-upload", status_code=202)
+def bulk_upload_cours(files: List[UploadFile] = File(...)):
+    """
+    Importer plusieurs cours et leurs activités en une requête : archives ZIP et/ou CSV.
+    Les activités sont rattachées aux cours par le titre de leur première ligne.
+    Rapport consolidé (un résultat par fichier) via GET /api/imports/{job_id}.
+    """
+    job = submit_bulk_import(files)
+    return job.to_dict()
 
-        page = models.Page(
-            description=description,
-            content=content,
-            medias=medias,
-            est_vue=0,
-            id_cours=db_cours.id
-        )
-        db.add(page)
-        created_pages += 1
-
-    if created_pages == 0:
-        db.rollback()
-        raise HTTPException(400, "Aucune page valide trouvée dans le CSV")
-
-    db.commit()
-    return db_cours
 @app.put("/api/cours/{cours_id}", response_model=schemas.Cours)
 def update_cours(cours_id: int, cours: schemas.CoursCreate, db: Session = Depends(get_db)):
     """Modifier un cours existant"""
-    db_cours = db.query(models.Cours).filter(models.Cours.id == cours_id).first()
+    # Un seul UPDATE : champs, version et updated_at
+    db_cours = update_by_id(db, models.Cours, cours_id, {**cours.dict(), **touch_values()})
     if not db_cours:
         raise HTTPException(status_code=404, detail="Cours non trouvé")
     
-    for key, value in cours.dict().items():
-        setattr(db_cours, key, value)
-    
     db.commit()
-    db.refresh(db_cours)
+    cache.invalidate("cours", f"cours:{cours_id}")
     return db_cours
 
 @app.delete("/api/cours/{cours_id}")
 def delete_cours(cours_id: int, db: Session = Depends(get_db)):
     """Supprimer un cours"""
-    db_cours = db.query(models.Cours).filter(models.Cours.id == cours_id).first()
-    if not db_cours:
+    # Un seul DELETE : pages et activités sont supprimées par la base (ON DELETE CASCADE)
+    if not delete_by_id(db, models.Cours, cours_id):
         raise HTTPException(status_code=404, detail="Cours non trouvé")
     
-    db.delete(db_cours)
     db.commit()
+    cache.invalidate("cours", f"cours:{cours_id}")
     return {"message": "Cours supprimé avec succès"}
 
 # ==================== ROUTES MODULE ====================
 
-@app.get("/api/modules", response_model=List[schemas.Module])
-def get_modules(db: Session = Depends(get_db)):
-    """Récupérer tous les modules"""
-    return db.query(models.Module).all()
+@app.get("/api/modules", response_model=schemas.PaginatedResponse)
+async def get_modules(params: PaginationParams = Depends(), db=Depends(get_read_db)):
+    """Récupérer les modules (paginés)"""
+    return await cache.cached("modules", vars(params), ["modules"], lambda: paginate(db, models.Module, params))
 
 @app.get("/api/modules/{module_id}", response_model=schemas.Module)
-def get_module_by_id(module_id: int, db: Session = Depends(get_db)):
+async def get_module_by_id(module_id: int, db=Depends(get_read_db)):
     """Récupérer un module par son ID"""
-    module = db.query(models.Module).filter(models.Module.id == module_id).first()
-    if not module:
-        raise HTTPException(status_code=404, detail="Module non trouvé")
-    return module
+    async def load():
+        module = await fetch_object(db, select(models.Module).where(models.Module.id == module_id))
+        if not module:
+            raise HTTPException(status_code=404, detail="Module non trouvé")
+        return schemas.Module.model_validate(module).model_dump()
+
+    return await cache.cached("module_detail", {"id": module_id}, ["modules"], load)
+
+MODULE_EXISTS = "Un module portant ce titre existe déjà"
 
 @app.post("/api/modules", response_model=schemas.Module)
 def create_module(module: schemas.ModuleCreate, db: Session = Depends(get_db)):
     """Créer un nouveau module"""
-    db_module = models.Module(**module.dict())
+    db_module = models.Module(**module.dict(), titre_key=titre_key(module.titre))
     db.add(db_module)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=MODULE_EXISTS)
+    cache.invalidate("modules")
     db.refresh(db_module)
     return db_module
 
 @app.put("/api/modules/{module_id}", response_model=schemas.Module)
 def update_module(module_id: int, module: schemas.ModuleCreate, db: Session = Depends(get_db)):
     """Modifier un module existant"""
-    db_module = db.query(models.Module).filter(models.Module.id == module_id).first()
+    try:
+        db_module = update_by_id(db, models.Module, module_id, {**module.dict(), "titre_key": titre_key(module.titre)})
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=MODULE_EXISTS)
     if not db_module:
         raise HTTPException(status_code=404, detail="Module non trouvé")
     
-    for key, value in module.dict().items():
-        setattr(db_module, key, value)
-    
     db.commit()
-    db.refresh(db_module)
+    module_ids.clear()
+    cache.invalidate("modules")
     return db_module
 
 @app.delete("/api/modules/{module_id}")
 def delete_module(module_id: int, db: Session = Depends(get_db)):
     """Supprimer un module"""
-    db_module = db.query(models.Module).filter(models.Module.id == module_id).first()
-    if not db_module:
+    # Ses cours et leur contenu sont supprimés par la base (ON DELETE CASCADE)
+    if not delete_by_id(db, models.Module, module_id):
         raise HTTPException(status_code=404, detail="Module non trouvé")
     
-    db.delete(db_module)
     db.commit()
+    module_ids.clear()
+    cache.invalidate(ALL)
     return {"message": "Module supprimé avec succès"}
 
 # ==================== ROUTES PAGE ====================
 
-@app.get("/api/pages", response_model=List[schemas.Page])
-def get_pages(db: Session = Depends(get_db)):
-    """Récupérer toutes les pages"""
-    return db.query(models.Page).all()
+@app.get("/api/pages", response_model=schemas.PaginatedResponse)
+async def get_pages(params: PaginationParams = Depends(), db=Depends(get_read_db)):
+    """Récupérer les pages (paginées)"""
+    return await paginate(db, models.Page, params)
+
+@app.get("/api/cours/{cours_id}/pages", response_model=schemas.PaginatedResponse)
+async def get_pages_by_cours(
+    cours_id: int,
+    request: Request,
+    response: Response,
+    params: PaginationParams = Depends(),
+    db=Depends(get_read_db),
+):
+    """Récupérer les pages d'un cours, dans l'ordre (paginées)"""
+    return await conditional_get(
+        request, response, db, "pages", cours_id, vars(params),
+        lambda version: cache.cached(
+            "cours_pages", {"id": cours_id, "version": version, **vars(params)}, [f"cours:{cours_id}"],
+            lambda: paginate(db, models.Page, params, models.Page.id_cours == cours_id),
+        ),
+    )
 
 @app.get("/api/pages/{page_id}", response_model=schemas.Page)
-def get_page_by_id(page_id: int, db: Session = Depends(get_db)):
+async def get_page_by_id(page_id: int, db=Depends(get_read_db)):
     """Récupérer une page par son ID"""
-    page = db.query(models.Page).filter(models.Page.id == page_id).first()
+    page = await fetch_object(db, select(models.Page).where(models.Page.id == page_id))
     if not page:
         raise HTTPException(status_code=404, detail="Page non trouvée")
     return page
@@ -293,38 +290,56 @@ def create_page(page: schemas.PageCreate, db: Session = Depends(get_db)):
     """Créer une nouvelle page"""
     db_page = models.Page(**page.dict())
     db.add(db_page)
+    touch_cours(db, db_page.id_cours, nb_pages=1)
     db.commit()
+    cache.invalidate("cours", f"cours:{db_page.id_cours}")
     db.refresh(db_page)
     return db_page
 
+@app.post("/api/pages/batch", response_model=schemas.BatchResult)
+def batch_pages(batch: schemas.PageBatch, db: Session = Depends(get_db)):
+    """Créer, modifier et supprimer des pages en une seule requête et une seule transaction"""
+    return apply_batch(
+        db, models.Page, "nb_pages",
+        create=[page.dict() for page in batch.create],
+        update_items=[page.dict(exclude_unset=True) for page in batch.update],
+        delete_ids=batch.delete,
+    )
+
 @app.put("/api/pages/{page_id}", response_model=schemas.Page)
 def update_page(page_id: int, page: schemas.PageUpdate, db: Session = Depends(get_db)):
     """Modifier une page existante"""
-    db_page = db.query(models.Page).filter(models.Page.id == page_id).first()
+    update_data = page.dict(exclude_unset=True)
+    db_page = update_by_id(db, models.Page, page_id, update_data)
     if not db_page:
         raise HTTPException(status_code=404, detail="Page non trouvée")
+    if not update_data:
+        return db_page
     
-    update_data = page.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_page, key, value)
-    
+    touch_cours(db, db_page["id_cours"])
     db.commit()
-    db.refresh(db_page)
+    cache.invalidate("cours", f"cours:{db_page['id_cours']}")
     return db_page
 
 @app.delete("/api/pages/{page_id}")
 def delete_page(page_id: int, db: Session = Depends(get_db)):
     """Supprimer une page"""
-    db_page = db.query(models.Page).filter(models.Page.id == page_id).first()
-    if not db_page:
+    cours_id = delete_child_by_id(db, models.Page, page_id)
+    if cours_id is None:
         raise HTTPException(status_code=404, detail="Page non trouvée")
     
-    db.delete(db_page)
+    touch_cours(db, cours_id, nb_pages=-1)
     db.commit()
+    cache.invalidate("cours", f"cours:{cours_id}")
     return {"message": "Page supprimée avec succès"}
 
 # Inclure les routeurs
 app.include_router(text_a_trou.router)
 app.include_router(qcm.router)
 app.include_router(jeu_classement.router)
+app.include_router(imports.router)
+app.include_router(metrics.router)
+app.include_router(health.router)
+app.include_router(search.router)
+app.include_router(export.router)
 
@@ -0,0 +1,206 @@
+"""
+Migrations du schéma, à lancer comme une étape séparée avant de démarrer l'API
+(et non à chaque démarrage de worker) :
+
+    python -m app.migrate            applique les migrations en attente
+    python -m app.migrate status     liste les migrations appliquées et en attente
+    python -m app.migrate explain    vérifie les plans d'exécution des listes par cours
+
+Les migrations sont les modules `mNNNN_nom.py` du paquet app.migrations ; les
+versions appliquées sont enregistrées dans la table `schema_version`.
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, select, text
+from sqlalchemy.engine import Connection, Engine
+from types import ModuleType
+from typing import List, Set
+import argparse
+import importlib
+import logging
+import pkgutil
+import re
+import sys
+
+from . import migrations, models
+from .database import init_engines
+from .logging_config import configure_logging
+
+logger = logging.getLogger(__name__)
+
+schema_version = Table(
+    "schema_version", MetaData(),
+    Column("version", Integer, primary_key=True, autoincrement=False),
+    Column("name", String(255), nullable=False),
+    Column("applied_at", DateTime, nullable=False, server_default=func.now()),
+)
+
+# Verrou MySQL : deux conteneurs démarrés ensemble ne migrent pas en même temps
+LOCK_NAME = "factoscope_migrate"
+LOCK_TIMEOUT = 300
+
+_MODULE_NAME = re.compile(r"^m(\d{4})_\w+$")
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    module: ModuleType
+
+    @property
+    def description(self) -> str:
+        return (self.module.__doc__ or "").strip()
+
+
+def discover() -> List[Migration]:
+    """Migrations du paquet app.migrations, triées par numéro"""
+    found = []
+    for info in pkgutil.iter_modules(migrations.__path__):
+        match = _MODULE_NAME.match(info.name)
+        if match:
+            module = importlib.import_module(f"{migrations.__name__}.{info.name}")
+            found.append(Migration(int(match.group(1)), info.name, module))
+
+    found.sort(key=lambda m: m.version)
+    versions = [m.version for m in found]
+    if len(set(versions)) != len(versions):
+        raise RuntimeError(f"Numéros de migration en double : {versions}")
+    return found
+
+
+def applied_versions(conn: Connection) -> Set[int]:
+    schema_version.create(conn, checkfirst=True)
+    return set(conn.execute(select(schema_version.c.version)).scalars())
+
+
+@contextmanager
+def _migration_lock(engine: Engine):
+    if engine.dialect.name != "mysql":
+        yield
+        return
+    with engine.connect() as conn:
+        acquired = conn.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": LOCK_NAME, "timeout": LOCK_TIMEOUT}).scalar()
+        if acquired != 1:
+            raise RuntimeError("Une autre migration est en cours")
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": LOCK_NAME})
+
+
+def upgrade(engine: Engine) -> List[Migration]:
+    """Applique les migrations en attente, chacune dans sa transaction. Retourne celles appliquées."""
+    applied = []
+    with _migration_lock(engine):
+        with engine.begin() as conn:
+            done = applied_versions(conn)
+
+        for migration in discover():
+            if migration.version in done:
+                continue
+            logger.info(f"Migration {migration.name} : {migration.description}")
+            with engine.begin() as conn:
+                migration.module.upgrade(conn)
+                conn.execute(schema_version.insert().values(version=migration.version, name=migration.name))
+            applied.append(migration)
+    return applied
+
+
+def pending(engine: Engine) -> List[Migration]:
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    return [m for m in discover() if m.version not in done]
+
+
+# ==================== VÉRIFICATION DES PLANS ====================
+
+# Tables listées par cours (GET /api/cours/{id}/pages, /api/qcm/{id}, ...)
+PER_COURS_MODELS = (models.Page, models.QCM, models.TextATrou, models.JeuClassement)
+
+
+def _plan(conn: Connection, statement) -> List[str]:
+    sql = str(statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row.detail for row in conn.execute(text("EXPLAIN QUERY PLAN " + sql))]
+    rows = conn.execute(text("EXPLAIN " + sql)).mappings().all()
+    return [f"type={row['type']} key={row['key']} extra={row['Extra'] or ''}" for row in rows]
+
+
+def _check_plan(dialect: str, plan: List[str], index: str, covering: bool) -> bool:
+    text_plan = " | ".join(plan)
+    if "filesort" in text_plan or "TEMP B-TREE" in text_plan:
+        return False
+    if dialect == "sqlite":
+        expected = f"COVERING INDEX {index}" if covering else f"INDEX {index}"
+        return expected in text_plan
+    return any(
+        f"key={index}" in line
+        and ("type=range" in line or "type=ref" in line)
+        and (not covering or "Using index" in line)
+        for line in plan
+    )
+
+
+def explain_per_cours(engine: Engine) -> List[str]:
+    """
+    Vérifie que les listes par cours (`WHERE id_cours = ? AND id > ? ORDER BY id LIMIT ?`)
+    sont des parcours d'intervalle sur l'index (id_cours, id), sans tri, et que la projection
+    sur les colonnes de l'index ne lit que l'index. Retourne les plans non conformes.
+    Sous MySQL, à lancer sur une base contenant des données (l'optimiseur peut
+    préférer un parcours complet d'une table presque vide).
+    """
+    failures = []
+    with engine.connect() as conn:
+        for model in PER_COURS_MODELS:
+            index = f"ix_{model.__tablename__}_id_cours_id"
+
+            def listing(*columns):
+                return (
+                    select(*columns)
+                    .where(model.id_cours == 1, model.id > 0)
+                    .order_by(model.id)
+                    .limit(51)
+                )
+
+            for label, statement, covering in (
+                ("index seul", listing(model.id, model.id_cours), True),
+                ("lignes complètes", listing(*model.__table__.c), False),
+            ):
+                plan = _plan(conn, statement)
+                ok = _check_plan(conn.dialect.name, plan, index, covering)
+                print(f"{'OK ' if ok else 'KO '} {model.__tablename__:<15} {label:<17} {' | '.join(plan)}")
+                if not ok:
+                    failures.append(f"{model.__tablename__} ({label})")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("command", nargs="?", default="upgrade", choices=("upgrade", "status", "explain"))
+    args = parser.parse_args(argv)
+
+    configure_logging()
+    engine = init_engines()
+
+    if args.command == "status":
+        todo = {m.version for m in pending(engine)}
+        for migration in discover():
+            state = "en attente" if migration.version in todo else "appliquée"
+            print(f"{migration.name:<35} {state:<11} {migration.description}")
+        return 0
+
+    if args.command == "explain":
+        failures = explain_per_cours(engine)
+        if failures:
+            print(f"Plans non conformes : {', '.join(failures)}")
+            return 1
+        return 0
+
+    applied = upgrade(engine)
+    print(f"{len(applied)} migration(s) appliquée(s)" if applied else "Schéma à jour")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,22 @@
+"""
+Migrations du schéma, appliquées par `python -m app.migrate` (voir app/migrate.py).
+
+Chaque module `mNNNN_nom.py` définit `upgrade(conn)` et est appliqué une seule fois,
+dans l'ordre des numéros. Les migrations vérifient l'état réel du schéma avant de le
+modifier : elles s'appliquent aussi bien à une base vide qu'à une base créée par
+l'ancien `create_all` ou par factoscope_V2.sql.
+"""
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection
+
+
+def has_table(conn: Connection, table: str) -> bool:
+    return inspect(conn).has_table(table)
+
+
+def has_column(conn: Connection, table: str, column: str) -> bool:
+    return any(c["name"] == column for c in inspect(conn).get_columns(table))
+
+
+def has_index(conn: Connection, table: str, name: str) -> bool:
+    return any(i["name"] == name for i in inspect(conn).get_indexes(table))
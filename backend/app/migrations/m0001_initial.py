@@ -0,0 +1,79 @@
+"""Tables module, cours, page, qcm, text_a_trou et jeu_classement"""
+from sqlalchemy import Column, ForeignKey, Integer, MetaData, String, Table, Text
+from sqlalchemy.engine import Connection
+
+# Schéma figé à la création : ne pas importer les modèles, qui évoluent
+metadata = MetaData()
+
+
+def _cours_fk():
+    return ForeignKey("cours.id", ondelete="CASCADE", onupdate="CASCADE")
+
+
+Table(
+    "module", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("titre", String(255), nullable=False),
+    Column("description", Text, nullable=False),
+)
+
+Table(
+    "cours", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("titre", String(255), nullable=False),
+    Column("description", Text, nullable=False),
+    Column("contenu", Text, nullable=False),
+    Column("id_module", Integer, ForeignKey("module.id", ondelete="CASCADE", onupdate="CASCADE")),
+)
+
+Table(
+    "page", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("description", Text),
+    Column("content", Text),
+    Column("medias", Text),
+    Column("est_vue", Integer),
+    Column("id_cours", Integer, _cours_fk(), nullable=False),
+)
+
+Table(
+    "qcm", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("question", String(255), nullable=False),
+    Column("rep1", String(255), nullable=False),
+    Column("rep2", String(255), nullable=False),
+    Column("rep3", String(255), nullable=False),
+    Column("rep4", String(255), nullable=False),
+    Column("soluce", Integer, nullable=False),
+    Column("id_cours", Integer, _cours_fk(), nullable=False),
+)
+
+Table(
+    "text_a_trou", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("texte", Text, nullable=False),
+    Column("reponse1", String(255), nullable=False),
+    Column("reponse2", String(255), nullable=False),
+    Column("reponse3", String(255), nullable=False),
+    Column("reponse4", String(255), nullable=False),
+    Column("soluce", Integer, nullable=False),
+    Column("id_cours", Integer, _cours_fk(), nullable=False),
+)
+
+Table(
+    "jeu_classement", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("question", Text, nullable=False),
+    Column("element1", String(500), nullable=False),
+    Column("element2", String(500), nullable=False),
+    Column("element3", String(500), nullable=False),
+    Column("element4", String(500), nullable=False),
+    Column("ordre_solution", String(100), nullable=False),
+    Column("type_elements", String(50), nullable=False),
+    Column("id_cours", Integer, _cours_fk(), nullable=False),
+)
+
+
+def upgrade(conn: Connection) -> None:
+    # Les tables déjà présentes (base existante) sont laissées telles quelles
+    metadata.create_all(conn, checkfirst=True)
@@ -0,0 +1,45 @@
+"""Version, updated_at et compteurs dénormalisés sur cours"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from . import has_column
+
+COLUMNS = (
+    ("version", "INTEGER NOT NULL DEFAULT 0"),
+    ("updated_at", "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP"),
+    ("nb_pages", "INTEGER NOT NULL DEFAULT 0"),
+    ("nb_qcm", "INTEGER NOT NULL DEFAULT 0"),
+    ("nb_text_a_trou", "INTEGER NOT NULL DEFAULT 0"),
+    ("nb_jeu_classement", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+# Compteur -> table fille comptée
+COUNTED = {
+    "nb_pages": "page",
+    "nb_qcm": "qcm",
+    "nb_text_a_trou": "text_a_trou",
+    "nb_jeu_classement": "jeu_classement",
+}
+
+
+def upgrade(conn: Connection) -> None:
+    added = []
+    for name, ddl in COLUMNS:
+        if not has_column(conn, "cours", name):
+            if conn.dialect.name == "sqlite" and name == "updated_at":
+                # SQLite refuse un DEFAULT non constant dans ADD COLUMN
+                ddl = "DATETIME NOT NULL DEFAULT '1970-01-01 00:00:00'"
+            conn.execute(text(f"ALTER TABLE cours ADD COLUMN {name} {ddl}"))
+            added.append(name)
+
+    if "updated_at" in added and conn.dialect.name == "sqlite":
+        conn.execute(text("UPDATE cours SET updated_at = CURRENT_TIMESTAMP"))
+
+    # Initialiser les compteurs ajoutés à partir des tables filles
+    counters = [name for name in added if name in COUNTED]
+    if counters:
+        assignments = ", ".join(
+            f"{name} = (SELECT COUNT(*) FROM {COUNTED[name]} WHERE {COUNTED[name]}.id_cours = cours.id)"
+            for name in counters
+        )
+        conn.execute(text(f"UPDATE cours SET {assignments}"))
@@ -0,0 +1,37 @@
+"""Index (id_cours, id) des tables filles, index module.titre, cours.contenu en TEXT"""
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection
+
+from . import has_index
+
+CHILD_TABLES = ("page", "qcm", "text_a_trou", "jeu_classement")
+
+# Index redondants créés par l'ancien create_all : index sur la clé primaire
+# (déjà indexée) et index simple page.id_cours (couvert par le composite)
+REDUNDANT = [(table, f"ix_{table}_id") for table in ("module", "cours") + CHILD_TABLES]
+REDUNDANT.append(("page", "ix_page_id_cours"))
+
+
+def upgrade(conn: Connection) -> None:
+    # Listes par cours : WHERE id_cours = ? AND id > ? ORDER BY id, sans tri
+    for table in CHILD_TABLES:
+        name = f"ix_{table}_id_cours_id"
+        if not has_index(conn, table, name):
+            conn.execute(text(f"CREATE INDEX {name} ON {table} (id_cours, id)"))
+
+    # Import CSV de cours : recherche du module par titre exact
+    if not has_index(conn, "module", "ix_module_titre"):
+        conn.execute(text("CREATE INDEX ix_module_titre ON module (titre)"))
+
+    # Supprimés après la création des composites : la clé étrangère id_cours
+    # reste couverte par un index sous MySQL
+    for table, name in REDUNDANT:
+        if has_index(conn, table, name):
+            drop = f"DROP INDEX {name} ON {table}" if conn.dialect.name == "mysql" else f"DROP INDEX {name}"
+            conn.execute(text(drop))
+
+    # factoscope_V2.sql déclarait contenu en varchar(255) : aligner sur le modèle
+    if conn.dialect.name == "mysql":
+        contenu = next(c for c in inspect(conn).get_columns("cours") if c["name"] == "contenu")
+        if "CHAR" in str(contenu["type"]).upper():
+            conn.execute(text("ALTER TABLE cours MODIFY contenu TEXT NOT NULL"))
@@ -0,0 +1,24 @@
+"""Index FULLTEXT de la recherche (MySQL uniquement)"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from . import has_index
+
+# Colonnes indexées par table : voir app/search.py
+FULLTEXT = {
+    "cours": ("titre", "description", "contenu"),
+    "page": ("description", "content"),
+    "qcm": ("question", "rep1", "rep2", "rep3", "rep4"),
+    "text_a_trou": ("texte",),
+    "jeu_classement": ("question",),
+}
+
+
+def upgrade(conn: Connection) -> None:
+    # Les autres bases (SQLite en développement) sont interrogées par LIKE, sans index
+    if conn.dialect.name != "mysql":
+        return
+    for table, columns in FULLTEXT.items():
+        name = f"ft_{table}"
+        if not has_index(conn, table, name):
+            conn.execute(text(f"CREATE FULLTEXT INDEX {name} ON {table} ({', '.join(columns)})"))
@@ -0,0 +1,50 @@
+"""Clé de titre normalisée et unique des modules (module.titre_key)"""
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+import unicodedata
+
+from . import has_column, has_index
+
+
+# Copie figée de module_lookup.titre_key à la date de la migration : ne pas importer
+# le code de l'application, qui évolue (et enregistre cache et listeners de session)
+def titre_key(titre: str) -> str:
+    text = unicodedata.normalize("NFKD", titre)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())[:255]
+
+
+def _backfill(conn: Connection) -> None:
+    rows = conn.execute(text("SELECT id, titre FROM module WHERE titre_key IS NULL ORDER BY id")).all()
+    taken = set(conn.execute(text("SELECT titre_key FROM module WHERE titre_key IS NOT NULL")).scalars())
+
+    updates = []
+    for module_id, titre in rows:
+        key = titre_key(titre)
+        # Titres déjà présents à un accent ou une majuscule près : le plus ancien garde
+        # la clé, les suivants sont suffixés par leur id (à fusionner ou renommer à la main)
+        if key in taken:
+            key = f"{key[:240]} #{module_id}"
+        taken.add(key)
+        updates.append({"id": module_id, "key": key})
+
+    if updates:
+        conn.execute(text("UPDATE module SET titre_key = :key WHERE id = :id"), updates)
+
+
+def upgrade(conn: Connection) -> None:
+    if not has_column(conn, "module", "titre_key"):
+        conn.execute(text("ALTER TABLE module ADD COLUMN titre_key VARCHAR(255)"))
+    _backfill(conn)
+
+    # SQLite ne sait pas modifier une colonne : elle y reste nullable, l'application la renseigne toujours
+    if conn.dialect.name == "mysql":
+        conn.execute(text("ALTER TABLE module MODIFY titre_key VARCHAR(255) NOT NULL"))
+
+    if not has_index(conn, "module", "uq_module_titre_key"):
+        conn.execute(text("CREATE UNIQUE INDEX uq_module_titre_key ON module (titre_key)"))
+
+    # Remplacé par la clé normalisée pour la recherche des modules
+    if has_index(conn, "module", "ix_module_titre"):
+        drop = "DROP INDEX ix_module_titre ON module" if conn.dialect.name == "mysql" else "DROP INDEX ix_module_titre"
+        conn.execute(text(drop))
@@ -0,0 +1,87 @@
+"""Empreintes des lignes importées (row_key, content_hash) et index unique (id_cours, row_key)"""
+from collections import Counter
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+import hashlib
+
+from . import has_column, has_index
+
+# Lignes relues et mises à jour par lot pendant le calcul des empreintes
+BACKFILL_BATCH = 1000
+
+# Copie figée de bulk.UPSERT_COLUMNS et bulk.RowHasher à la version 6 du schéma : la migration
+# ne doit pas changer si le code de l'application évolue
+UPSERT_COLUMNS = {
+    "page": (("description",), ("description", "content", "medias")),
+    "qcm": (("question",), ("question", "rep1", "rep2", "rep3", "rep4", "soluce")),
+    "text_a_trou": (("texte",), ("texte", "reponse1", "reponse2", "reponse3", "reponse4", "soluce")),
+    "jeu_classement": (
+        ("question",),
+        ("question", "element1", "element2", "element3", "element4", "ordre_solution", "type_elements"),
+    ),
+}
+
+
+def _digest(values) -> str:
+    text = "\x1f".join("" if value is None else str(value) for value in values)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _row_hashes(table: str, row, seen: Counter):
+    """(row_key, content_hash) d'une ligne ; `seen` compte les lignes de même identité du cours"""
+    key, content = UPSERT_COLUMNS[table]
+    content_hash = _digest(row[name] for name in content)
+    identity = _digest(row[name] for name in key) if any(row[name] for name in key) else content_hash
+    rank = seen[identity]
+    seen[identity] += 1
+    return _digest((identity, rank)), content_hash
+
+
+def _backfill(conn: Connection, table: str) -> None:
+    """
+    Calcule les empreintes des lignes existantes, cours par cours et par tranches d'id
+    (index (id_cours, id)). Les lignes de même titre d'un cours sont numérotées dans
+    l'ordre des id, comme celles d'un fichier importé : chaque ligne reçoit une clé unique.
+    """
+    columns = ", ".join(UPSERT_COLUMNS[table][1])
+    cours_ids = conn.execute(text(f"SELECT DISTINCT id_cours FROM {table}")).scalars().all()
+    for cours_id in cours_ids:
+        seen: Counter = Counter()
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                text(
+                    f"SELECT id, {columns} FROM {table} "
+                    f"WHERE id_cours = :cours_id AND id > :last ORDER BY id LIMIT :size"
+                ),
+                {"cours_id": cours_id, "last": last_id, "size": BACKFILL_BATCH},
+            ).mappings().all()
+            if not rows:
+                break
+
+            updates = []
+            for row in rows:
+                row_key, content_hash = _row_hashes(table, row, seen)
+                updates.append({"id": row["id"], "row_key": row_key, "content_hash": content_hash})
+            conn.execute(
+                text(f"UPDATE {table} SET row_key = :row_key, content_hash = :content_hash WHERE id = :id"),
+                updates,
+            )
+            last_id = rows[-1]["id"]
+
+
+def upgrade(conn: Connection) -> None:
+    for table in UPSERT_COLUMNS:
+        for column in ("row_key", "content_hash"):
+            if not has_column(conn, table, column):
+                conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} VARCHAR(32)"))
+        _backfill(conn, table)
+
+        # Upsert des imports : une recherche indexée par lot (id_cours, row_key IN (...))
+        name = f"uq_{table}_id_cours_row_key"
+        if not has_index(conn, table, name):
+            conn.execute(text(f"CREATE UNIQUE INDEX {name} ON {table} (id_cours, row_key)"))
+
+    # Réimport d'un cours : recherche du cours existant par titre
+    if not has_index(conn, "cours", "ix_cours_titre"):
+        conn.execute(text("CREATE INDEX ix_cours_titre ON cours (titre)"))
@@ -1,51 +1,99 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Boolean, DateTime, Index, func, null
 from sqlalchemy.orm import relationship
 from .database import Base
 
+# Colonnes techniques (clé de titre des modules, empreintes des imports CSV), jamais renvoyées par l'API
+INTERNAL_COLUMNS = ("titre_key", "row_key", "content_hash")
+
+
+def public_columns(model):
+    """Colonnes de la table de `model` exposées par l'API"""
+    return [c for c in model.__table__.columns if c.key not in INTERNAL_COLUMNS]
+
 class Module(Base):
     __tablename__ = "module"
+    # Un seul module par titre, sans tenir compte des accents ni de la casse (module_lookup.titre_key) :
+    # l'import CSV de cours recherche le module par cette clé
+    __table_args__ = (Index("uq_module_titre_key", "titre_key", unique=True),)
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     titre = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
+    titre_key = Column(String(255), nullable=False)
     
     # Relations
-    cours = relationship("Cours", back_populates="module")
+    # passive_deletes : la suppression des cours est laissée à la base (ON DELETE CASCADE)
+    cours = relationship("Cours", back_populates="module", passive_deletes=True)
 
 class Cours(Base):
     __tablename__ = "cours"
+    # Recherche plein texte (MySQL, voir search.py et migrations/m0004_fulltext.py)
+    # Import CSV d'un cours existant : recherche par titre (voir importer.import_cours_csv)
+    __table_args__ = (
+        Index("ft_cours", "titre", "description", "contenu", mysql_prefix="FULLTEXT"),
+        Index("ix_cours_titre", "titre"),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     titre = Column(String(255), nullable=False)
     description = Column(Text, nullable=False)
     contenu = Column(Text, nullable=False)
     id_module = Column(Integer, ForeignKey("module.id", ondelete="CASCADE", onupdate="CASCADE"))
+    # Incrémenté à chaque modification du cours ou de son contenu (ETag)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
+    # default : aussi renseignée à l'INSERT sous SQLite, où la colonne ajoutée par migration a un défaut constant
+    updated_at = Column(DateTime, nullable=False, default=func.now(), server_default=func.now())
+    # Compteurs dénormalisés, maintenus par versioning.touch_cours
+    nb_pages = Column(Integer, nullable=False, default=0, server_default="0")
+    nb_qcm = Column(Integer, nullable=False, default=0, server_default="0")
+    nb_text_a_trou = Column(Integer, nullable=False, default=0, server_default="0")
+    nb_jeu_classement = Column(Integer, nullable=False, default=0, server_default="0")
     
-    # Relations
+    # Relations (passive_deletes : les lignes filles sont supprimées par la base, sans être chargées)
     module = relationship("Module", back_populates="cours")
-    pages = relationship("Page", back_populates="cours", cascade="all, delete-orphan")
-    qcms = relationship("QCM", back_populates="cours", cascade="all, delete-orphan")
-    text_a_trou = relationship("TextATrou", back_populates="cours", cascade="all, delete-orphan")
-    jeux_classement = relationship("JeuClassement", back_populates="cours", cascade="all, delete-orphan")
+    pages = relationship("Page", back_populates="cours", cascade="all, delete-orphan", passive_deletes=True, order_by="Page.id")
+    qcms = relationship("QCM", back_populates="cours", cascade="all, delete-orphan", passive_deletes=True, order_by="QCM.id")
+    text_a_trou = relationship("TextATrou", back_populates="cours", cascade="all, delete-orphan", passive_deletes=True, order_by="TextATrou.id")
+    jeux_classement = relationship("JeuClassement", back_populates="cours", cascade="all, delete-orphan", passive_deletes=True, order_by="JeuClassement.id")
 
 
 class Page(Base):
     __tablename__ = "page"
+    # Listes par cours : WHERE id_cours = ? AND id > ? ORDER BY id (voir migrations/m0003_indexes.py),
+    # recherche plein texte sous MySQL (voir search.py et migrations/m0004_fulltext.py)
+    # et upsert des imports CSV par (id_cours, row_key) (voir bulk.upsert_rows)
+    __table_args__ = (
+        Index("ix_page_id_cours_id", "id_cours", "id"),
+        Index("ft_page", "description", "content", mysql_prefix="FULLTEXT"),
+        Index("uq_page_id_cours_row_key", "id_cours", "row_key", unique=True),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     description = Column(Text)
     content = Column(Text)
     medias = Column(Text, default="")
     est_vue = Column(Integer, default=0)
     id_cours = Column(Integer, ForeignKey("cours.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+    # Empreintes des imports CSV (bulk.RowHasher) : clé de la ligne dans son cours et contenu importé.
+    # Toute autre modification efface content_hash : le prochain import réécrit la ligne.
+    row_key = Column(String(32))
+    content_hash = Column(String(32), onupdate=null())
     
     # Relations
     cours = relationship("Cours", back_populates="pages")
 
 class QCM(Base):
     __tablename__ = "qcm"
+    # Listes par cours : WHERE id_cours = ? AND id > ? ORDER BY id (voir migrations/m0003_indexes.py),
+    # recherche plein texte sous MySQL (voir search.py et migrations/m0004_fulltext.py)
+    # et upsert des imports CSV par (id_cours, row_key) (voir bulk.upsert_rows)
+    __table_args__ = (
+        Index("ix_qcm_id_cours_id", "id_cours", "id"),
+        Index("ft_qcm", "question", "rep1", "rep2", "rep3", "rep4", mysql_prefix="FULLTEXT"),
+        Index("uq_qcm_id_cours_row_key", "id_cours", "row_key", unique=True),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     question = Column(String(255), nullable=False)
     rep1 = Column(String(255), nullable=False)
     rep2 = Column(String(255), nullable=False)
@@ -53,14 +101,26 @@ class QCM(Base):
     rep4 = Column(String(255), nullable=False)
     soluce = Column(Integer, nullable=False)
     id_cours = Column(Integer, ForeignKey("cours.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+    # Empreintes des imports CSV (bulk.RowHasher) : clé de la ligne dans son cours et contenu importé.
+    # Toute autre modification efface content_hash : le prochain import réécrit la ligne.
+    row_key = Column(String(32))
+    content_hash = Column(String(32), onupdate=null())
     
     # Relations
     cours = relationship("Cours", back_populates="qcms")
 
 class TextATrou(Base):
     __tablename__ = "text_a_trou"
+    # Listes par cours : WHERE id_cours = ? AND id > ? ORDER BY id (voir migrations/m0003_indexes.py),
+    # recherche plein texte sous MySQL (voir search.py et migrations/m0004_fulltext.py)
+    # et upsert des imports CSV par (id_cours, row_key) (voir bulk.upsert_rows)
+    __table_args__ = (
+        Index("ix_text_a_trou_id_cours_id", "id_cours", "id"),
+        Index("ft_text_a_trou", "texte", mysql_prefix="FULLTEXT"),
+        Index("uq_text_a_trou_id_cours_row_key", "id_cours", "row_key", unique=True),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     texte = Column(Text, nullable=False)
     reponse1 = Column(String(255), nullable=False)
     reponse2 = Column(String(255), nullable=False)
@@ -68,6 +128,10 @@ class TextATrou(Base):
     reponse4 = Column(String(255), nullable=False)
     soluce = Column(Integer, nullable=False)  # 1, 2, 3 ou 4
     id_cours = Column(Integer, ForeignKey("cours.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+    # Empreintes des imports CSV (bulk.RowHasher) : clé de la ligne dans son cours et contenu importé.
+    # Toute autre modification efface content_hash : le prochain import réécrit la ligne.
+    row_key = Column(String(32))
+    content_hash = Column(String(32), onupdate=null())
     
     # Relations
 
@@ -75,8 +139,16 @@ class TextATrou(Base):
 
 class JeuClassement(Base):
     __tablename__ = "jeu_classement"
+    # Listes par cours : WHERE id_cours = ? AND id > ? ORDER BY id (voir migrations/m0003_indexes.py),
+    # recherche plein texte sous MySQL (voir search.py et migrations/m0004_fulltext.py)
+    # et upsert des imports CSV par (id_cours, row_key) (voir bulk.upsert_rows)
+    __table_args__ = (
+        Index("ix_jeu_classement_id_cours_id", "id_cours", "id"),
+        Index("ft_jeu_classement", "question", mysql_prefix="FULLTEXT"),
+        Index("uq_jeu_classement_id_cours_row_key", "id_cours", "row_key", unique=True),
+    )
     
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     question = Column(Text, nullable=False)
     element1 = Column(String(500), nullable=False)
     element2 = Column(String(500), nullable=False)
@@ -85,6 +157,10 @@ class JeuClassement(Base):
     ordre_solution = Column(String(100), nullable=False)  # ex: "2<1<4<3"
     type_elements = Column(String(50), nullable=False)  # "texte" ou "images"
     id_cours = Column(Integer, ForeignKey("cours.id", ondelete="CASCADE", onupdate="CASCADE"), nullable=False)
+    # Empreintes des imports CSV (bulk.RowHasher) : clé de la ligne dans son cours et contenu importé.
+    # Toute autre modification efface content_hash : le prochain import réécrit la ligne.
+    row_key = Column(String(32))
+    content_hash = Column(String(32), onupdate=null())
     
     # Relations
     cours = relationship("Cours", back_populates="jeux_classement")
@@ -0,0 +1,115 @@
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+from typing import Dict, Optional
+import threading
+import time
+import unicodedata
+
+from . import models
+from .cache import CACHE_TTL
+
+# Nombre maximum de titres gardés par processus
+MAX_CACHED_MODULES = 4096
+
+
+def titre_key(titre: str) -> str:
+    """Clé unique d'un module : titre sans accents ni majuscules, espaces normalisés"""
+    text = unicodedata.normalize("NFKD", titre)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return " ".join(text.casefold().split())[:255]
+
+
+class ModuleIdCache:
+    """
+    Clé de titre -> id de module, local au processus. Vidé à chaque modification ou
+    suppression de module dans ce processus ; les entrées expirent après CACHE_TTL
+    secondes pour borner l'effet des modifications faites par les autres workers.
+    """
+
+    def __init__(self, ttl: int, max_entries: int):
+        self._entries: Dict[str, tuple] = {}
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[int]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                return None
+            return entry[1]
+
+    def put(self, key: str, module_id: int) -> None:
+        with self._lock:
+            if len(self._entries) >= self._max_entries:
+                self._entries.clear()
+            self._entries[key] = (time.monotonic() + self._ttl, module_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+module_ids = ModuleIdCache(CACHE_TTL, MAX_CACHED_MODULES)
+
+
+# Un id obtenu dans une transaction n'est mis en cache qu'après son commit
+# (le module a pu être créé par cette transaction)
+_PENDING = "module_ids"
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    for key, module_id in session.info.pop(_PENDING, {}).items():
+        module_ids.put(key, module_id)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending(session):
+    session.info.pop(_PENDING, None)
+
+
+def _upsert(db: Session, titre: str, description: str, key: str) -> int:
+    """Crée le module s'il n'existe pas, en une requête. Retourne son id dans les deux cas."""
+    table = models.Module.__table__
+    values = {"titre": titre, "description": description, "titre_key": key}
+    dialect = db.get_bind().dialect
+
+    if dialect.name == "mysql":
+        # Module existant : LAST_INSERT_ID(id) fait renvoyer son id par lastrowid
+        statement = mysql.insert(table).values(values).on_duplicate_key_update(id=func.last_insert_id(table.c.id))
+        return db.execute(statement).lastrowid
+
+    if dialect.name == "sqlite" and dialect.insert_returning:
+        # DO UPDATE sans effet (DO NOTHING ne renverrait pas la ligne existante)
+        statement = sqlite.insert(table).values(values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.titre_key], set_={"titre_key": statement.excluded.titre_key}
+        ).returning(table.c.id)
+        return db.execute(statement).scalar_one()
+
+    module_id = db.execute(select(table.c.id).where(table.c.titre_key == key)).scalar()
+    if module_id is None:
+        module_id = db.execute(table.insert().values(values)).inserted_primary_key[0]
+    return module_id
+
+
+def resolve_module(db: Session, titre: str, description: Optional[str] = None) -> Optional[int]:
+    """
+    Id du module de titre `titre` (sans tenir compte des accents ni de la casse).
+    S'il n'existe pas : le crée si `description` est fournie, sinon retourne None.
+    Ne fait pas de commit.
+    """
+    key = titre_key(titre)
+    module_id = module_ids.get(key)
+    if module_id is not None:
+        return module_id
+
+    if description is None:
+        module_id = db.execute(select(models.Module.id).where(models.Module.titre_key == key)).scalar()
+        if module_id is not None:
+            module_ids.put(key, module_id)
+        return module_id
+
+    module_id = _upsert(db, titre, description, key)
+    db.info.setdefault(_PENDING, {})[key] = module_id
+    return module_id
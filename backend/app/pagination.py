@@ -0,0 +1,65 @@
+from fastapi import HTTPException, Query
+from sqlalchemy import select
+from typing import Any, Dict, List, Optional
+
+from .database import fetch_all
+from .models import public_columns
+
+# Taille de page par défaut et maximale des listes
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class PaginationParams:
+    """Paramètres communs des listes : curseur (after_id), taille et projection"""
+
+    def __init__(
+        self,
+        after_id: Optional[int] = Query(None, ge=0, description="Renvoyer les éléments dont l'id est strictement supérieur"),
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Nombre maximum d'éléments"),
+        fields: Optional[str] = Query(None, description="Colonnes à renvoyer, séparées par des virgules (ex: id,titre)"),
+    ):
+        self.after_id = after_id
+        self.limit = limit
+        self.fields = fields
+
+
+def parse_fields(model, fields: Optional[str]) -> List[str]:
+    """Liste des colonnes demandées (toutes par défaut, `id` toujours inclus)"""
+    columns = [c.key for c in public_columns(model)]
+    if not fields:
+        return columns
+
+    requested = []
+    for name in fields.split(","):
+        name = name.strip()
+        if name and name not in requested:
+            requested.append(name)
+
+    unknown = [name for name in requested if name not in columns]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Champs inconnus : {', '.join(unknown)}")
+
+    return ["id"] + [name for name in requested if name != "id"]
+
+
+async def paginate(db, model, params: PaginationParams, *criteria) -> Dict[str, Any]:
+    """
+    Pagination par curseur sur la clé primaire : `WHERE id > :after_id ORDER BY id LIMIT :limit`.
+    Seules les colonnes demandées sont lues en base. `db` peut être une Session ou une AsyncSession.
+    """
+    names = parse_fields(model, params.fields)
+
+    statement = select(*[model.__table__.c[name] for name in names]).where(*criteria)
+    if params.after_id is not None:
+        statement = statement.where(model.id > params.after_id)
+
+    # On lit un élément de plus pour savoir s'il reste une page suivante
+    rows = await fetch_all(db, statement.order_by(model.id).limit(params.limit + 1))
+    has_more = len(rows) > params.limit
+    items = [dict(row._mapping) for row in rows[:params.limit]]
+
+    return {
+        "items": items,
+        "next_cursor": items[-1]["id"] if has_more else None,
+    }
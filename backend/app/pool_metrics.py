@@ -0,0 +1,83 @@
+from bisect import bisect_left
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Any, Dict
+import threading
+import time
+
+# Bornes (ms) de l'histogramme des temps de checkout
+CHECKOUT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class PoolMetrics:
+    """Compteurs de checkout d'un pool de connexions (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+        # Un compteur par borne + un pour "au-delà"
+        self.histogram = [0] * (len(CHECKOUT_BUCKETS_MS) + 1)
+
+    def observe(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            self.histogram[bisect_left(CHECKOUT_BUCKETS_MS, wait_ms)] += 1
+
+    def timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool) -> Dict[str, Any]:
+        with self._lock:
+            buckets = {f"le_{bound}ms": count for bound, count in zip(CHECKOUT_BUCKETS_MS, self.histogram)}
+            buckets["inf"] = self.histogram[-1]
+            checkouts = self.checkouts
+            return {
+                "size": pool.size(),
+                "max_overflow": pool._max_overflow,
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "wait_ms_avg": round(self.wait_ms_total / checkouts, 3) if checkouts else 0.0,
+                "wait_ms_max": round(self.wait_ms_max, 3),
+                "checkout_latency_histogram": buckets,
+            }
+
+
+class _InstrumentedPoolMixin:
+    """Mesure la durée de chaque checkout (attente d'une connexion libre ou ouverture)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # Conserver les compteurs si le pool est recréé (dispose)
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.timeout()
+            raise
+        self.metrics.observe((time.perf_counter() - start) * 1000)
+        return conn
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
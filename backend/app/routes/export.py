@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Iterator, Literal, Optional
+
+from .. import models
+from ..database import get_db
+from ..export import (
+    EXPORT_TABLES, activity_import_csv, cours_import_csv, ndjson_stream, stream_rows, table_csv, table_statement,
+)
+from ..importer import IMPORT_SPECS
+
+router = APIRouter(
+    prefix="/api/export",
+    tags=["Export"]
+)
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _attachment(body: Iterator[bytes], format: str, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
+
+
+def _model(table: str):
+    model = EXPORT_TABLES.get(table)
+    if model is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Table inconnue : {table} (attendu : {', '.join(EXPORT_TABLES)})"
+        )
+    return model
+
+
+@router.get("/{table}")
+def export_table(table: str, format: Literal["ndjson", "csv"] = "ndjson", cours_id: Optional[int] = None):
+    """
+    Exporter une table entière (toutes les colonnes, par id croissant), éventuellement limitée
+    à un cours avec `cours_id`. CSV : séparateur `;` et ligne d'en-tête avec les noms de colonnes.
+    La réponse est envoyée au fil de la lecture (curseur côté serveur).
+    """
+    model = _model(table)
+    if cours_id is not None and model is models.Module:
+        raise HTTPException(status_code=400, detail="Les modules ne peuvent pas être filtrés par cours")
+
+    rows = stream_rows(table_statement(model, cours_id))
+    body = ndjson_stream(rows) if format == "ndjson" else table_csv(model, rows)
+    return _attachment(body, format, table if cours_id is None else f"{table}-{cours_id}")
+
+
+@router.get("/{table}/{cours_id}")
+def export_cours(
+    table: str,
+    cours_id: int,
+    format: Literal["csv", "ndjson"] = "csv",
+    db: Session = Depends(get_db)
+):
+    """
+    Exporter un cours (`cours`) ou ses activités (`qcm`, `text_a_trou`, `jeu_classement`).
+    CSV : au format des imports, le fichier peut être renvoyé tel quel à
+    POST /api/cours/upload ou POST /api/{type}/upload/{cours_id}.
+    NDJSON : toutes les colonnes des pages ou des activités du cours.
+    """
+    if table != "cours" and table not in IMPORT_SPECS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Type inconnu : {table} (attendu : cours, {', '.join(IMPORT_SPECS)})"
+        )
+
+    db_cours = db.query(models.Cours).filter(models.Cours.id == cours_id).first()
+    if not db_cours:
+        raise HTTPException(status_code=404, detail=f"Cours avec l'ID {cours_id} non trouvé")
+
+    filename = f"{table}-{cours_id}"
+    if format == "ndjson":
+        model = models.Page if table == "cours" else IMPORT_SPECS[table].model
+        return _attachment(ndjson_stream(stream_rows(table_statement(model, cours_id))), format, filename)
+
+    if table == "cours":
+        module = db.get(models.Module, db_cours.id_module) if db_cours.id_module else None
+        return _attachment(cours_import_csv(db_cours, module), format, filename)
+    return _attachment(activity_import_csv(table, db_cours), format, filename)
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Response
+
+from ..health import readiness
+
+router = APIRouter(tags=["Santé"])
+
+@router.get("/healthz")
+def get_liveness():
+    """Processus vivant : ne dépend ni de la base ni du pool"""
+    return {"status": "ok"}
+
+@router.get("/readyz")
+def get_readiness(response: Response):
+    """Worker prêt à recevoir du trafic : base joignable, pool non saturé, imports absorbés (503 sinon)"""
+    state = readiness()
+    if state["status"] != "ok":
+        response.status_code = 503
+    return state
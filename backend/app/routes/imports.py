@@ -0,0 +1,16 @@
+from fastapi import APIRouter, HTTPException
+
+from ..jobs import get_job
+
+router = APIRouter(
+    prefix="/api/imports",
+    tags=["Imports"]
+)
+
+@router.get("/{job_id}")
+def get_import_job(job_id: str):
+    """Progression et rapport d'un import CSV lancé en arrière-plan"""
+    job = get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import introuvable")
+    return job.to_dict()
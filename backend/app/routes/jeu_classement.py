@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Request, Response
 from sqlalchemy.orm import Session
 from .. import models
-from ..database import get_db
-import csv
-import io
+from ..batch import apply_batch
+from ..cache import cache
+from ..crud import delete_child_by_id, update_by_id
+from ..database import get_db, get_read_db
+from ..pagination import PaginationParams, paginate
+from ..importer import CsvField, ImportStats, RowSpec, import_csv, register
+from ..jobs import submit_import
+from ..versioning import touch_cours, conditional_get
 import logging
 from typing import List, Dict, Any, Optional
 
 from .. import models, schemas
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
@@ -17,15 +21,6 @@ router = APIRouter(
     tags=["Jeu à Classement"]
 )
 
-def _clean_cell(x: Optional[str]) -> str:
-    return (x or "").strip()
-
-def _is_header_line(row: List[str]) -> bool:
-    # Format: "Titre_cours_relie_au_jeu;"
-    # => souvent une seule colonne non vide
-    cleaned = [c for c in map(_clean_cell, row) if c]
-    return len(cleaned) == 1
-
 def _validate_ordre_solution(ordre: str) -> bool:
     """Valide le format de l'ordre solution: ex: '2<1<4<3'"""
     if not ordre:
@@ -39,8 +34,23 @@ def _validate_ordre_solution(ordre: str) -> bool:
     except ValueError:
         return False
 
-@router.post("/upload/{cours_id}", status_code=status.HTTP_201_CREATED)
-async def upload_jeu_classement(
+JEU_CLASSEMENT_SPEC = register(RowSpec(
+    name="jeu_classement",
+    model=models.JeuClassement,
+    fields=(
+        CsvField("question"),
+        CsvField("element1"),
+        CsvField("element2"),
+        CsvField("element3"),
+        CsvField("element4"),
+        CsvField("ordre_solution", validate=_validate_ordre_solution, error="ordre_solution invalide"),
+        CsvField("type_elements", parse=str.lower, validate=lambda t: t in ("texte", "images"),
+                 error="type_elements doit être 'texte' ou 'images'"),
+    ),
+))
+
+@router.post("/upload/{cours_id}", status_code=status.HTTP_202_ACCEPTED)
+def upload_jeu_classement(
     cours_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
@@ -49,6 +59,8 @@ async def upload_jeu_classement(
     Upload CSV Jeu à Classement pour un cours.
     Format attendu (après éventuelle première ligne titre) :
       question;element1;element2;element3;element4;ordre_solution;type_elements
+    L'import est exécuté en arrière-plan : la réponse contient un job_id
+    à suivre via GET /api/imports/{job_id}.
     """
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Le fichier doit être au format CSV")
@@ -58,135 +70,49 @@ async def upload_jeu_classement(
     if not db_cours:
         raise HTTPException(status_code=404, detail=f"Cours avec l'ID {cours_id} non trouvé")
 
-    try:
-        content = await file.read()
-        try:
-            content_str = content.decode("utf-8-sig")
-        except UnicodeDecodeError:
-            raise HTTPException(status_code=400, detail="Le fichier doit être encodé en UTF-8")
-
-        reader = csv.reader(io.StringIO(content_str), delimiter=";", skipinitialspace=True)
-
-        rows = []
-        for r in reader:
-            # ignorer lignes vides / commentaires
-            if not r:
-                continue
-            if "".join(r).strip() == "":
-                continue
-            if _clean_cell(r[0]).startswith("#"):
-                continue
-            rows.append(r)
-
-        if not rows:
-            raise HTTPException(status_code=400, detail="Le fichier est vide")
-
-        # Si première ligne = titre, on la saute
-        start_idx = 1 if _is_header_line(rows[0]) else 0
-        data_rows = rows[start_idx:]
-
-        valid = []
-        invalid_count = 0
-
-        for i, row in enumerate(data_rows, start=start_idx + 1):
-            cleaned = [_clean_cell(c) for c in row]
-            # On veut 7 colonnes
-            cleaned = cleaned[:7]
-
-            # Vérif colonnes
-            if len(cleaned) < 7:
-                invalid_count += 1
-                logger.warning(f"Ligne {i} invalide: moins de 7 colonnes")
-                continue
-
-            question, e1, e2, e3, e4, ordre, type_elem = cleaned
-
-            if not question or not e1 or not e2 or not e3 or not e4 or not ordre or not type_elem:
-                invalid_count += 1
-                logger.warning(f"Ligne {i} invalide: champs manquants")
-                continue
-
-            # Valider le type d'éléments
-            if type_elem.lower() not in ["texte", "images"]:
-                invalid_count += 1
-                logger.warning(f"Ligne {i} invalide: type_elements doit être 'texte' ou 'images': {type_elem}")
-                continue
-
-            # Valider l'ordre solution
-            if not _validate_ordre_solution(ordre):
-                invalid_count += 1
-                logger.warning(f"Ligne {i} invalide: ordre_solution invalide: {ordre}")
-                continue
-
-            valid.append((question, e1, e2, e3, e4, ordre, type_elem.lower()))
-
-        if not valid:
-            raise HTTPException(status_code=400, detail="Aucune ligne valide trouvée dans le fichier")
-
-        added = 0
-        for (question, e1, e2, e3, e4, ordre, type_elem) in valid:
-            q = models.JeuClassement(
-                question=question,
-                element1=e1,
-                element2=e2,
-                element3=e3,
-                element4=e4,
-                ordre_solution=ordre,
-                type_elements=type_elem,
-                id_cours=cours_id
-            )
-            db.add(q)
-            added += 1
-
-        db.commit()
-
+    def run(session: Session, fileobj, stats: ImportStats):
+        details = import_csv(session, JEU_CLASSEMENT_SPEC, fileobj, cours_id, stats)
+        # Réimport sans changement : ni version ni compteurs modifiés
+        if details["questions_added"] or details["questions_updated"]:
+            touch_cours(session, cours_id, nb_jeu_classement=details["questions_added"])
         return {
             "status": "success",
-            "message": f"{added} questions de classement ont été ajoutées avec succès",
-            "details": {
-                "total_rows": len(rows),
-                "data_rows": len(data_rows),
-                "valid_rows": len(valid),
-                "questions_added": added,
-                "invalid_rows": invalid_count
-            }
+            "message": (
+                f"{details['questions_added']} questions de classement ajoutées, {details['questions_updated']} modifiées, "
+                f"{details['questions_skipped']} inchangées"
+            ),
+            "details": details
         }
 
-    except HTTPException:
-        db.rollback()
-        raise
-    except Exception as e:
-        db.rollback()
-        logger.error("Erreur upload CSV Jeu à Classement", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Erreur inattendue: {str(e)}")
-
-
-@router.get("/{cours_id}")
-def get_jeu_classement_par_cours(cours_id: int, db: Session = Depends(get_db)):
-    qs = db.query(models.JeuClassement).filter(models.JeuClassement.id_cours == cours_id).all()
-    return [
-        {
-            "id": q.id,
-            "question": q.question,
-            "element1": q.element1,
-            "element2": q.element2,
-            "element3": q.element3,
-            "element4": q.element4,
-            "ordre_solution": q.ordre_solution,
-            "type_elements": q.type_elements,
-            "id_cours": q.id_cours,
-        }
-        for q in qs
-    ]
+    job = submit_import("jeu_classement", file, run, invalidate=("cours", f"cours:{cours_id}"))
+    return job.to_dict()
+
+
+@router.get("/{cours_id}", response_model=schemas.PaginatedResponse)
+async def get_jeu_classement_par_cours(
+    cours_id: int,
+    request: Request,
+    response: Response,
+    params: PaginationParams = Depends(),
+    db=Depends(get_read_db),
+):
+    return await conditional_get(
+        request, response, db, "jeu_classement", cours_id, vars(params),
+        lambda version: cache.cached(
+            "jeu_classement", {"id": cours_id, "version": version, **vars(params)}, [f"cours:{cours_id}"],
+            lambda: paginate(db, models.JeuClassement, params, models.JeuClassement.id_cours == cours_id),
+        ),
+    )
 
 @router.delete("/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_jeu_classement(question_id: int, db: Session = Depends(get_db)):
-    q = db.query(models.JeuClassement).filter(models.JeuClassement.id == question_id).first()
-    if not q:
+    cours_id = delete_child_by_id(db, models.JeuClassement, question_id)
+    if cours_id is None:
         raise HTTPException(status_code=404, detail="Question de classement introuvable")
 
-    db.delete(q)
+    touch_cours(db, cours_id, nb_jeu_classement=-1)
     db.commit()
+    cache.invalidate("cours", f"cours:{cours_id}")
     return None
 
 # Schémas pour Jeu à Classement
@@ -202,14 +128,7 @@ class JeuClassementUpdate(BaseModel):
     ordre_solution: Optional[str] = None
     type_elements: Optional[str] = None
 
-@router.put("/{question_id}")
-def update_jeu_classement(question_id: int, payload: JeuClassementUpdate, db: Session = Depends(get_db)):
-    q = db.query(models.JeuClassement).filter(models.JeuClassement.id == question_id).first()
-    if not q:
-        raise HTTPException(status_code=404, detail="Question de classement introuvable")
-
-    data = payload.dict(exclude_unset=True)
-
+def _check_update(data: Dict[str, Any]) -> None:
     # Validation de l'ordre solution si fourni
     if "ordre_solution" in data and data["ordre_solution"] is not None:
         if not _validate_ordre_solution(data["ordre_solution"]):
@@ -220,20 +139,33 @@ def update_jeu_classement(question_id: int, payload: JeuClassementUpdate, db: Se
         if data["type_elements"].lower() not in ["texte", "images"]:
             raise HTTPException(status_code=400, detail="type_elements doit être 'texte' ou 'images'")
 
-    for k, v in data.items():
-        setattr(q, k, v)
+@router.put("/{question_id}")
+def update_jeu_classement(question_id: int, payload: JeuClassementUpdate, db: Session = Depends(get_db)):
+    data = payload.dict(exclude_unset=True)
+    _check_update(data)
 
-    db.commit()
-    db.refresh(q)
-
-    return {
-        "id": q.id,
-        "question": q.question,
-        "element1": q.element1,
-        "element2": q.element2,
-        "element3": q.element3,
-        "element4": q.element4,
-        "ordre_solution": q.ordre_solution,
-        "type_elements": q.type_elements,
-        "id_cours": q.id_cours,
-    }
+    q = update_by_id(db, models.JeuClassement, question_id, data)
+    if not q:
+        raise HTTPException(status_code=404, detail="Question de classement introuvable")
+
+    if data:
+        touch_cours(db, q["id_cours"])
+        db.commit()
+        cache.invalidate("cours", f"cours:{q['id_cours']}")
+    return q
+
+
+class JeuClassementBatchUpdate(JeuClassementUpdate):
+    id: int
+
+class JeuClassementBatch(BaseModel):
+    update: List[JeuClassementBatchUpdate] = []
+    delete: List[int] = []
+
+@router.patch("/batch", response_model=schemas.BatchResult)
+def batch_jeu_classement(batch: JeuClassementBatch, db: Session = Depends(get_db)):
+    """Modifier et supprimer des questions de classement en une seule requête et une seule transaction"""
+    updates = [item.dict(exclude_unset=True) for item in batch.update]
+    for item in updates:
+        _check_update(item)
+    return apply_batch(db, models.JeuClassement, "nb_jeu_classement", update_items=updates, delete_ids=batch.delete)
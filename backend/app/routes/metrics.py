@@ -0,0 +1,19 @@
+from fastapi import APIRouter
+
+from ..cache import cache
+from ..database import pool_status
+
+router = APIRouter(
+    prefix="/api/metrics",
+    tags=["Métriques"]
+)
+
+@router.get("/pool")
+def get_pool_metrics():
+    """Utilisation du pool de connexions : connexions prises, overflow, temps d'attente"""
+    return pool_status()
+
+@router.get("/cache")
+def get_cache_metrics():
+    """Efficacité du cache de lecture : hits, misses, nombre d'entrées"""
+    return cache.stats()
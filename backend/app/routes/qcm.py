@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status, Request, Response
 from sqlalchemy.orm import Session
 from .. import models
-from ..database import get_db
-import csv
-import io
+from ..batch import apply_batch
+from ..cache import cache
+from ..crud import delete_child_by_id, update_by_id
+from ..database import get_db, get_read_db
+from ..pagination import PaginationParams, paginate
+from ..importer import CsvField, ImportStats, RowSpec, import_csv, register
+from ..jobs import submit_import
+from ..versioning import touch_cours, conditional_get
 import logging
 from typing import List, Dict, Any, Optional
 
 from .. import models, schemas
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
@@ -17,17 +21,21 @@ router = APIRouter(
     tags=["QCM"]
 )
 
-def _clean_cell(x: Optional[str]) -> str:
-    return (x or "").strip()
-
-def _is_header_line(row: List[str]) -> bool:
-    # Format: "Titre_cours_relie_au_jeu;"
-    # => souvent une seule colonne non vide
-    cleaned = [c for c in map(_clean_cell, row) if c]
-    return len(cleaned) == 1
-
-@router.post("/upload/{cours_id}", status_code=status.HTTP_201_CREATED)
-async def upload_qcm(
+QCM_SPEC = register(RowSpec(
+    name="qcm",
+    model=models.QCM,
+    fields=(
+        CsvField("question"),
+        CsvField("rep1"),
+        CsvField("rep2"),
+        CsvField("rep3"),
+        CsvField("rep4"),
+        CsvField("soluce", parse=int, validate=lambda n: n in (1, 2, 3, 4), error="solution hors 1..4"),
+    ),
+))
+
+@router.post("/upload/{cours_id}", status_code=status.HTTP_202_ACCEPTED)
+def upload_qcm(
     cours_id: int,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
@@ -36,6 +44,8 @@ async def upload_qcm(
     Upload CSV QCM pour un cours.
     Format attendu (après éventuelle première ligne titre) :
       question;reponse1;reponse2;reponse3;reponse4;solution
+    L'import est exécuté en arrière-plan : la réponse contient un job_id
+    à suivre via GET /api/imports/{job_id}.
     """
     if not file.filename.lower().endswith(".csv"):
         raise HTTPException(status_code=400, detail="Le fichier doit être au format CSV")
@@ -45,134 +55,49 @@ async def upload_qcm(
     if not db_cours:
         raise HTTPException(status_code=404, detail=f"Cours avec l'ID {cours_id} non trouvé")
 
-    try:
-        content = await file.read()
-        try:
-            content_str = content.decode("utf-8-sig")
-        except UnicodeDecodeError:
-            raise HTTPException(status_code=400, detail="Le fichier doit être encodé en UTF-8")
-
-        reader = csv.reader(io.StringIO(content_str), delimiter=";", skipinitialspace=True)
-
-        rows = []
-        for r in reader:
-            # ignorer lignes vides / commentaires
-            if not r:
-                continue
-            if "".join(r).strip() == "":
-                continue
-            if _clean_cell(r[0]).startswith("#"):
-                continue
-            rows.append(r)
-
-        if not rows:
-            raise HTTPException(status_code=400, detail="Le fichier est vide")
-
-        # Si première ligne = titre, on la saute
-        start_idx = 1 if _is_header_line(rows[0]) else 0
-        data_rows = rows[start_idx:]
-
-        valid = []
-        invalid_count = 0
-
-        for i, row in enumerate(data_rows, start=start_idx + 1):
-            cleaned = [_clean_cell(c) for c in row]
-            # On garde les colonnes même si certaines sont vides (mais on veut 6 colonnes)
-            # Certains CSV ont un ; final -> ça crée une colonne vide en plus, donc on tronque à 6.
-            cleaned = cleaned[:6]
-
-            # Vérif colonnes
-            if len(cleaned) < 6:
-                invalid_count += 1
-                logger.warning(f"Ligne {i} invalide: moins de 6 colonnes")
-                continue
-
-            question, r1, r2, r3, r4, solution = cleaned
-
-            if not question or not r1 or not r2 or not r3 or not r4 or not solution:
-                invalid_count += 1
-                logger.warning(f"Ligne {i} invalide: champs manquants")
-                continue
-
-            try:
-                solution_int = int(solution)
-            except ValueError:
-                invalid_count += 1
-                logger.warning(f"Ligne {i} invalide: solution non numérique: {solution}")
-                continue
-
-            if solution_int not in (1, 2, 3, 4):
-                invalid_count += 1
-                logger.warning(f"Ligne {i} invalide: solution hors 1..4: {solution_int}")
-                continue
-
-            valid.append((question, r1, r2, r3, r4, solution_int))
-
-        if not valid:
-            raise HTTPException(status_code=400, detail="Aucune ligne valide trouvée dans le fichier")
-
-        added = 0
-        for (question, r1, r2, r3, r4, solution_int) in valid:
-            q = models.QCM(
-                question=question,
-                rep1=r1,
-                rep2=r2,
-                rep3=r3,
-                rep4=r4,
-                soluce=solution_int,
-                id_cours=cours_id
-            )
-            db.add(q)
-            added += 1
-
-        db.commit()
-
+    def run(session: Session, fileobj, stats: ImportStats):
+        details = import_csv(session, QCM_SPEC, fileobj, cours_id, stats)
+        # Réimport sans changement : ni version ni compteurs modifiés
+        if details["questions_added"] or details["questions_updated"]:
+            touch_cours(session, cours_id, nb_qcm=details["questions_added"])
         return {
             "status": "success",
-            "message": f"{added} questions QCM ont été ajoutées avec succès",
-            "details": {
-                "total_rows": len(rows),
-                "data_rows": len(data_rows),
-                "valid_rows": len(valid),
-                "questions_added": added,
-                "invalid_rows": invalid_count
-            }
+            "message": (
+                f"{details['questions_added']} questions QCM ajoutées, {details['questions_updated']} modifiées, "
+                f"{details['questions_skipped']} inchangées"
+            ),
+            "details": details
         }
 
-    except HTTPException:
-        db.rollback()
-        raise
-    except Exception as e:
-        db.rollback()
-        logger.error("Erreur upload CSV QCM", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Erreur inattendue: {str(e)}")
-
-
-@router.get("/{cours_id}")
-def get_qcm_par_cours(cours_id: int, db: Session = Depends(get_db)):
-    qs = db.query(models.QCM).filter(models.QCM.id_cours == cours_id).all()
-    return [
-        {
-            "id": q.id,
-            "question": q.question,
-            "rep1": q.rep1,
-            "rep2": q.rep2,
-            "rep3": q.rep3,
-            "rep4": q.rep4,
-            "soluce": q.soluce,
-            "id_cours": q.id_cours,
-        }
-        for q in qs
-    ]
+    job = submit_import("qcm", file, run, invalidate=("cours", f"cours:{cours_id}"))
+    return job.to_dict()
+
+
+@router.get("/{cours_id}", response_model=schemas.PaginatedResponse)
+async def get_qcm_par_cours(
+    cours_id: int,
+    request: Request,
+    response: Response,
+    params: PaginationParams = Depends(),
+    db=Depends(get_read_db),
+):
+    return await conditional_get(
+        request, response, db, "qcm", cours_id, vars(params),
+        lambda version: cache.cached(
+            "qcm", {"id": cours_id, "version": version, **vars(params)}, [f"cours:{cours_id}"],
+            lambda: paginate(db, models.QCM, params, models.QCM.id_cours == cours_id),
+        ),
+    )
 
 @router.delete("/{question_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_qcm(question_id: int, db: Session = Depends(get_db)):
-    q = db.query(models.QCM).filter(models.QCM.id == question_id).first()
-    if not q:
+    cours_id = delete_child_by_id(db, models.QCM, question_id)
+    if cours_id is None:
         raise HTTPException(status_code=404, detail="Question QCM introuvable")
 
-    db.delete(q)
+    touch_cours(db, cours_id, nb_qcm=-1)
     db.commit()
+    cache.invalidate("cours", f"cours:{cours_id}")
     return None
 
 # Schémas pour QCM
@@ -189,10 +114,6 @@ class QCMUpdate(BaseModel):
 
 @router.put("/{question_id}")
 def update_qcm(question_id: int, payload: QCMUpdate, db: Session = Depends(get_db)):
-    q = db.query(models.QCM).filter(models.QCM.id == question_id).first()
-    if not q:
-        raise HTTPException(status_code=404, detail="Question QCM introuvable")
-
     data = payload.dict(exclude_unset=True)
 
     # petite validation
@@ -201,19 +122,26 @@ def update_qcm(question_id: int, payload: QCMUpdate, db: Session = Depends(get_d
         if n < 1 or n > 4:
             raise HTTPException(status_code=400, detail="soluce doit être entre 1 et 4")
 
-    for k, v in data.items():
-        setattr(q, k, v)
+    q = update_by_id(db, models.QCM, question_id, data)
+    if not q:
+        raise HTTPException(status_code=404, detail="Question QCM introuvable")
 
-    db.commit()
-    db.refresh(q)
-
-    return {
-        "id": q.id,
-        "question": q.question,
-        "rep1": q.rep1,
-        "rep2": q.rep2,
-        "rep3": q.rep3,
-        "rep4": q.rep4,
-        "soluce": q.soluce,
-        "id_cours": q.id_cours,
-    }
+    if data:
+        touch_cours(db, q["id_cours"])
+        db.commit()
+        cache.invalidate("cours", f"cours:{q['id_cours']}")
+    return q
+
+
+class QCMBatchUpdate(QCMUpdate):
+    id: int
+
+class QCMBatch(BaseModel):
+    update: List[QCMBatchUpdate] = []
+    delete: List[int] = []
+
+@router.patch("/batch", response_model=schemas.BatchResult)
+def batch_qcm(batch: QCMBatch, db: Session = Depends(get_db)):
+    """Modifier et supprimer des questions QCM en une seule requête et une seule transaction"""
+    updates = [item.dict(exclude_unset=True) for item in batch.update]
+    return apply_batch(db, models.QCM, "nb_qcm", update_items=updates, delete_ids=batch.delete)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from .. import schemas
+from ..cache import cache
+from ..database import get_read_db
+from ..search import SearchParams, search
+
+router = APIRouter(
+    prefix="/api/search",
+    tags=["Recherche"]
+)
+
+@router.get("", response_model=schemas.PaginatedResponse)
+async def search_catalogue(params: SearchParams = Depends(), db=Depends(get_read_db)):
+    """Rechercher dans les cours, pages, QCM, textes à trous et jeux de classement (classés par pertinence)"""
+    # Toute écriture sur un cours ou son contenu invalide le tag "cours"
+    return await cache.cached("search", vars(params), ["cours"], lambda: search(db, params))
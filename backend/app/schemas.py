@@ -1,5 +1,11 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+# Réponse paginée des listes (voir pagination.py)
+class PaginatedResponse(BaseModel):
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[int] = None
 
 # Schémas pour Module
 class ModuleBase(BaseModel):
@@ -27,6 +33,12 @@ class CoursCreate(CoursBase):
 
 class Cours(CoursBase):
     id: int
+    version: int = 0
+    updated_at: Optional[datetime] = None
+    nb_pages: int = 0
+    nb_qcm: int = 0
+    nb_text_a_trou: int = 0
+    nb_jeu_classement: int = 0
     
     class Config:
         from_attributes = True
@@ -53,6 +65,21 @@ class PageUpdate(BaseModel):
     content: Optional[str] = None
     medias: Optional[str] = ""
     est_vue: Optional[int] = 0
+
+class PageBatchUpdate(PageUpdate):
+    id: int
+
+# Lot d'opérations sur les pages (POST /api/pages/batch)
+class PageBatch(BaseModel):
+    create: List[PageCreate] = []
+    update: List[PageBatchUpdate] = []
+    delete: List[int] = []
+
+# Résultat d'un lot : une entrée par opération
+class BatchResult(BaseModel):
+    created: List[Dict[str, Any]] = []
+    updated: List[Dict[str, Any]] = []
+    deleted: List[Dict[str, Any]] = []
     
 # Schémas pour QCM
 class QCMBase(BaseModel):
@@ -87,3 +114,25 @@ class TextATrouOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class JeuClassementOut(BaseModel):
+    id: int
+    question: str
+    element1: str
+    element2: str
+    element3: str
+    element4: str
+    ordre_solution: str
+    type_elements: str
+    id_cours: int
+
+    class Config:
+        from_attributes = True
+
+# Cours complet : module, pages et activités (GET /api/cours/{id}/bundle)
+class CoursBundle(Cours):
+    module: Optional[Module] = None
+    pages: List[Page] = []
+    qcms: List[QCM] = []
+    text_a_trou: List[TextATrouOut] = []
+    jeux_classement: List[JeuClassementOut] = []
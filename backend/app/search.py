@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+from fastapi import HTTPException, Query
+from sqlalchemy import Float, and_, case, or_, select, type_coerce
+from sqlalchemy.dialects.mysql import match
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import re
+
+from . import models
+from .database import fetch_all
+
+# Taille de page par défaut et maximale des résultats
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+# Au-delà, la fusion des résultats de chaque table devient coûteuse : affiner la recherche
+MAX_OFFSET = 1000
+# Longueur des extraits renvoyés, et contexte gardé avant le premier mot trouvé
+EXCERPT_LENGTH = 200
+EXCERPT_CONTEXT = 50
+# Nombre maximum de mots pris en compte par la recherche LIKE
+MAX_TERMS = 10
+
+
+@dataclass(frozen=True)
+class SearchTarget:
+    kind: str
+    model: Any
+    # Colonnes de l'index FULLTEXT (même ordre que migrations/m0004_fulltext.py)
+    columns: Tuple[str, ...]
+    # Colonne renvoyée comme libellé du résultat
+    label: str
+
+    @property
+    def id_cours(self):
+        return self.model.id if self.model is models.Cours else self.model.id_cours
+
+
+TARGETS = (
+    SearchTarget("cours", models.Cours, ("titre", "description", "contenu"), "titre"),
+    SearchTarget("page", models.Page, ("description", "content"), "description"),
+    SearchTarget("qcm", models.QCM, ("question", "rep1", "rep2", "rep3", "rep4"), "question"),
+    SearchTarget("text_a_trou", models.TextATrou, ("texte",), "texte"),
+    SearchTarget("jeu_classement", models.JeuClassement, ("question",), "question"),
+)
+KINDS = [target.kind for target in TARGETS]
+
+
+class SearchParams:
+    """Paramètres de GET /api/search : texte, types de résultats et pagination par décalage"""
+
+    def __init__(
+        self,
+        q: str = Query(..., min_length=2, max_length=200, description="Texte recherché"),
+        types: Optional[str] = Query(None, description=f"Types de résultats, séparés par des virgules ({', '.join(KINDS)})"),
+        offset: int = Query(0, ge=0, le=MAX_OFFSET, description="Nombre de résultats à sauter (next_cursor de la page précédente)"),
+        limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT, description="Nombre maximum de résultats"),
+    ):
+        self.q = q.strip()
+        self.types = types
+        self.offset = offset
+        self.limit = limit
+
+
+def parse_types(types: Optional[str]) -> List[SearchTarget]:
+    if not types:
+        return list(TARGETS)
+    requested = {name.strip() for name in types.split(",") if name.strip()}
+    unknown = sorted(requested - set(KINDS))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Types inconnus : {', '.join(unknown)}")
+    return [target for target in TARGETS if target.kind in requested]
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _statement(dialect: str, target: SearchTarget, q: str, count: int):
+    """Les `count` meilleurs résultats d'une table : (id, id_cours, label, score)"""
+    model = target.model
+    columns = [getattr(model, name) for name in target.columns]
+
+    if dialect == "mysql":
+        # Score de pertinence de l'index FULLTEXT ; le WHERE et l'ORDER BY utilisent l'index
+        criterion = match(*columns, against=q).in_natural_language_mode()
+        score = type_coerce(criterion, Float).label("score")
+        # Tri sur le seul score : InnoDB ne lit que les `count` meilleurs documents de l'index
+        order_by = (score.desc(),)
+    else:
+        # Repli sans index (SQLite en développement) : tous les mots doivent apparaître,
+        # le score compte les colonnes contenant chaque mot
+        terms = [f"%{_escape_like(term)}%" for term in q.split()[:MAX_TERMS]]
+        score = sum(
+            case((column.ilike(pattern, escape="\\"), 1.0), else_=0.0)
+            for pattern in terms for column in columns
+        ).label("score")
+        criterion = and_(*[or_(*[column.ilike(pattern, escape="\\") for column in columns]) for pattern in terms])
+        order_by = (score.desc(), model.id)
+
+    return (
+        select(
+            model.id.label("id"),
+            target.id_cours.label("id_cours"),
+            getattr(model, target.label).label("label"),
+            score,
+        )
+        .where(criterion)
+        .order_by(*order_by)
+        .limit(count)
+    )
+
+
+def _excerpt(values: Dict[str, Any], target: SearchTarget, terms: Sequence[str]) -> str:
+    """
+    Extrait de la première colonne (ordre de l'index) contenant un mot recherché, centré sur
+    sa première occurrence ; à défaut (ex: correspondance FULLTEXT sur une forme proche), le libellé.
+    """
+    pattern = re.compile("|".join(re.escape(term) for term in terms), re.IGNORECASE) if terms else None
+    for name in target.columns:
+        text = values[name] or ""
+        found = pattern.search(text) if pattern else None
+        if found:
+            start = max(0, found.start() - EXCERPT_CONTEXT)
+            end = start + EXCERPT_LENGTH
+            return ("…" if start else "") + text[start:end].strip() + ("…" if end < len(text) else "")
+    return (values[target.label] or "")[:EXCERPT_LENGTH]
+
+
+async def _add_excerpts(db, hits: List[Dict[str, Any]], targets: Sequence[SearchTarget], q: str) -> None:
+    """Extraits des seuls résultats de la page : une requête par table, colonnes indexées par id"""
+    terms = q.split()[:MAX_TERMS]
+    for target in targets:
+        page_hits = [hit for hit in hits if hit["type"] == target.kind]
+        if not page_hits:
+            continue
+        model = target.model
+        statement = select(model.id, *[getattr(model, name) for name in target.columns]).where(
+            model.id.in_([hit["id"] for hit in page_hits])
+        )
+        rows = {row.id: row._mapping for row in await fetch_all(db, statement)}
+        for hit in page_hits:
+            row = rows.get(hit["id"])
+            hit["extrait"] = _excerpt(row, target, terms) if row else hit["libelle"]
+
+
+async def search(db, params: SearchParams) -> Dict[str, Any]:
+    """
+    Recherche dans les cours, pages et activités, résultats classés par pertinence.
+    Chaque table renvoie ses `offset + limit + 1` meilleurs résultats, fusionnés puis découpés :
+    `next_cursor` est l'offset de la page suivante. Les extraits ne sont lus que pour la page renvoyée.
+    `db` peut être une Session ou une AsyncSession.
+    """
+    targets = parse_types(params.types)
+    dialect = db.get_bind().dialect.name
+    count = params.offset + params.limit + 1
+
+    hits = []
+    for target in targets:
+        for row in await fetch_all(db, _statement(dialect, target, params.q, count)):
+            hits.append({
+                "type": target.kind,
+                "id": row.id,
+                "id_cours": row.id_cours,
+                "libelle": (row.label or "")[:EXCERPT_LENGTH],
+                "score": round(float(row.score), 4),
+            })
+
+    hits.sort(key=lambda hit: (-hit["score"], KINDS.index(hit["type"]), hit["id"]))
+    end = params.offset + params.limit
+    items = hits[params.offset:end]
+    await _add_excerpts(db, items, targets, params.q)
+    return {
+        "items": items,
+        "next_cursor": end if len(hits) > end and end <= MAX_OFFSET else None,
+    }
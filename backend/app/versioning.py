@@ -0,0 +1,95 @@
+from fastapi import Request, Response
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from typing import Any, Awaitable, Callable, Dict, Optional
+import hashlib
+
+from . import models
+from .database import fetch_all
+
+
+# Compteurs dénormalisés de `cours`, maintenus par touch_cours
+COUNTERS = ("nb_pages", "nb_qcm", "nb_text_a_trou", "nb_jeu_classement")
+
+
+def touch_values(**deltas: int) -> Dict[str, Any]:
+    """Valeurs SET d'un cours modifié : version + 1, updated_at et variation des compteurs"""
+    values = {"version": models.Cours.version + 1, "updated_at": func.now()}
+    for name, delta in deltas.items():
+        if name not in COUNTERS:
+            raise ValueError(f"Compteur inconnu : {name}")
+        if delta:
+            values[name] = getattr(models.Cours, name) + delta
+    return values
+
+
+def _touch(db: Session, criterion, deltas: Dict[str, int]) -> None:
+    db.execute(
+        update(models.Cours)
+        .where(criterion)
+        .values(**touch_values(**deltas))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def touch_cours(db: Session, cours_id: Optional[int], **deltas: int) -> None:
+    """
+    Marque un cours comme modifié dans la transaction en cours (une seule requête UPDATE) :
+    version + 1, updated_at, et variation des compteurs (ex: nb_qcm=+3).
+    À appeler avant le commit de toute écriture sur un cours ou son contenu.
+    """
+    if cours_id is not None:
+        _touch(db, models.Cours.id == cours_id, deltas)
+
+
+async def get_cours_version(db, cours_id: int) -> Optional[int]:
+    rows = await fetch_all(db, select(models.Cours.version).where(models.Cours.id == cours_id))
+    return rows[0][0] if rows else None
+
+
+def make_etag(kind: str, cours_id: int, version: int, params: Optional[Dict[str, Any]] = None) -> str:
+    """ETag fort : ressource + cours + version (+ empreinte des paramètres de la liste)"""
+    etag = f"{kind}-{cours_id}-v{version}"
+    if params:
+        query = "&".join(f"{k}={params[k]}" for k in sorted(params))
+        etag += "-" + hashlib.sha1(query.encode()).hexdigest()[:12]
+    return f'"{etag}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match utilise la comparaison faible : on ignore le préfixe W/
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    db,
+    kind: str,
+    cours_id: int,
+    params: Optional[Dict[str, Any]],
+    load: Callable[[Optional[int]], Awaitable[Any]],
+) -> Any:
+    """
+    Répond 304 sans lire ni sérialiser les lignes si le client a déjà la version courante
+    du cours (If-None-Match), sinon appelle `load(version)` et ajoute l'ETag à la réponse.
+    `load` doit inclure `version` dans sa clé de cache : un worker dont le cache local n'a
+    pas été invalidé ne peut pas renvoyer un ancien contenu sous le nouvel ETag.
+    """
+    version = await get_cours_version(db, cours_id)
+    if version is None:
+        # Cours inexistant : `load` décide de la réponse (404 ou liste vide)
+        return await load(None)
+
+    etag = make_etag(kind, cours_id, version, params)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return await load(version)
@@ -0,0 +1,58 @@
+"""
+Client HTTP commun aux benchmarks (bibliothèque standard uniquement) : requêtes JSON,
+uploads multipart, attente des jobs d'import et percentiles.
+Les scripts sont lancés avec `python bench/<script>.py` : ce module est importé depuis leur dossier.
+"""
+import json
+import time
+import urllib.request
+import uuid
+
+
+def request(method, url, body=None, headers=None):
+    """Requête HTTP, réponse JSON décodée (None si le corps est vide)"""
+    req = urllib.request.Request(url, data=body, headers=headers or {}, method=method)
+    with urllib.request.urlopen(req) as res:
+        data = res.read()
+    return json.loads(data) if data else None
+
+
+def multipart(files):
+    """Corps multipart et en-têtes : `files` est une liste de (champ, nom de fichier, contenu)"""
+    boundary = uuid.uuid4().hex
+    body = b""
+    for name, filename, payload in files:
+        content_type = "text/csv" if filename.endswith(".csv") else "application/octet-stream"
+        body += (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode() + payload + b"\r\n"
+    return body + f"--{boundary}--\r\n".encode(), {"Content-Type": f"multipart/form-data; boundary={boundary}"}
+
+
+def wait(base, job, interval=0.2):
+    """Attend la fin d'un job d'import (GET /api/imports/{job_id}), retourne son état final"""
+    while job["status"] in ("pending", "running"):
+        time.sleep(interval)
+        job = request("GET", f"{base}/api/imports/{job['job_id']}")
+    return job
+
+
+def upload(url, payload, filename="import.csv", interval=0.2):
+    """Upload d'un CSV (champ `file`), puis attente de la fin du job d'import"""
+    job = request("POST", url, *multipart([("file", filename, payload)]))
+    job = wait(url.split("/api/")[0], job, interval)
+    if job["status"] != "done":
+        raise RuntimeError(f"Import {filename} en échec : {job['detail']}")
+    return job
+
+
+def csv_bytes(lines):
+    """Lignes CSV déjà formatées, encodées en UTF-8"""
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p / 100))]
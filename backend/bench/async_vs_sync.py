@@ -0,0 +1,91 @@
+"""
+Benchmark : moteur synchrone vs mode asynchrone (DB_ASYNC=1).
+
+Lancer deux instances de l'API sur la même base, chacune avec un seul worker et sans cache
+(les routes mesurées sont des lectures mises en cache : avec le cache, on mesurerait le cache
+et non le moteur SQLAlchemy) :
+    CACHE_BACKEND=none uvicorn app.main:app --port 8000                  # mode synchrone
+    CACHE_BACKEND=none DB_ASYNC=1 uvicorn app.main:app --port 8001       # mode asynchrone
+
+puis :
+    python bench/async_vs_sync.py sync=http://localhost:8000 async=http://localhost:8001 --concurrency 200
+
+Pour chaque instance, affiche le débit et les latences p50 / p99 d'un mélange
+de routes de lecture (liste des cours, cours, bundle) à la concurrence demandée.
+Refuse une instance dont le cache est actif (GET /api/metrics/cache).
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+
+from _client import percentile, request
+
+
+def _run(base, paths, duration, concurrency):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(offset):
+        nonlocal errors
+        i = offset
+        while time.monotonic() < deadline:
+            url = base + paths[i % len(paths)]
+            i += 1
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=30) as res:
+                    res.read()
+            except (urllib.error.URLError, OSError):
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="+", help="label=url, ex: sync=http://localhost:8000")
+    parser.add_argument("--cours-id", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+
+    paths = [
+        "/api/cours?limit=50",
+        f"/api/cours/{args.cours_id}",
+        f"/api/cours/{args.cours_id}/bundle",
+    ]
+
+    targets = [target.partition("=")[::2] for target in args.targets]
+    for label, base in targets:
+        backend = request("GET", f"{base.rstrip('/')}/api/metrics/cache")["backend"]
+        if backend != "none":
+            raise SystemExit(f"{label} : cache actif ({backend}), relancer l'API avec CACHE_BACKEND=none")
+
+    for label, base in targets:
+        latencies, errors = _run(base.rstrip("/"), paths, args.duration, args.concurrency)
+        if not latencies:
+            print(f"{label:<8} aucune requête réussie ({errors} erreurs)")
+            continue
+        print(
+            f"{label:<8} {len(latencies) / args.duration:8.1f} req/s  "
+            f"p50={statistics.median(latencies):7.1f} ms  p99={percentile(latencies, 99):7.1f} ms  "
+            f"erreurs={errors}"
+        )
+
+
+if __name__ == "__main__":
+    main()
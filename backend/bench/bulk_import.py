@@ -0,0 +1,80 @@
+"""
+Benchmark de l'import groupé : un ZIP de `--courses` cours (pages, QCM, textes à trous,
+jeux de classement) importé par POST /api/cours/bulk-upload, comparé avec `--compare`
+aux imports unitaires (une requête par cours puis par activité, soit 4 par cours).
+
+Usage (API démarrée) :
+    python bench/bulk_import.py --url http://localhost:8000 --courses 300 --rows 50 --compare
+"""
+import argparse
+import io
+import time
+import uuid
+import zipfile
+
+from _client import csv_bytes, multipart, request, upload, wait
+
+
+def _course_files(titre, rows):
+    """(chemin dans le ZIP, contenu) des 4 CSV d'un cours"""
+    return [
+        (f"{titre}.csv", csv_bytes([f"{titre};Cours de test;Module de benchmark;Module créé par le benchmark"]
+                              + [f"Page {i};Contenu {i};" for i in range(rows)])),
+        (f"qcm/{titre}.csv", csv_bytes([f"{titre};"] + [f"Question {i} ?;A;B;C;D;{i % 4 + 1}" for i in range(rows)])),
+        (f"tat/{titre}.csv", csv_bytes([f"{titre};"] + [f"Le ___ numéro {i};A;B;C;D;{i % 4 + 1}" for i in range(rows)])),
+        (f"jeu/{titre}.csv", csv_bytes([f"{titre};"] + [f"Classer {i};A;B;C;D;2<1<4<3;texte" for i in range(rows)])),
+    ]
+
+
+def bulk(base, courses):
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as z:
+        for files in courses:
+            for path, payload in files:
+                z.writestr(path, payload)
+
+    start = time.perf_counter()
+    job = wait(base, request("POST", f"{base}/api/cours/bulk-upload", *multipart([("files", "lot.zip", archive.getvalue())])))
+    elapsed = time.perf_counter() - start
+    if job["status"] != "done":
+        raise RuntimeError(f"Import groupé en échec : {job['detail']}")
+
+    report = job["result"]
+    if report["failed"]:
+        raise RuntimeError(f"{report['failed']} fichiers en échec : {job['errors'][:5]}")
+    return elapsed, 1
+
+
+def unitary(base, courses):
+    start = time.perf_counter()
+    requests = 0
+    for files in courses:
+        (_, cours_csv), *activities = files
+        cours_id = upload(f"{base}/api/cours/upload", cours_csv, "cours.csv")["result"]["id"]
+        requests += 1
+        for (path, payload), route in zip(activities, ("qcm", "text-a-true", "jeu-classement")):
+            upload(f"{base}/api/{route}/upload/{cours_id}", payload, "activite.csv")
+            requests += 1
+    return time.perf_counter() - start, requests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--courses", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=50, help="Lignes par CSV")
+    parser.add_argument("--compare", action="store_true", help="Mesurer aussi les imports unitaires")
+    args = parser.parse_args()
+    base = args.url.rstrip("/")
+
+    runs = [("groupé", bulk)] + ([("unitaire", unitary)] if args.compare else [])
+    for label, run in runs:
+        run_id = uuid.uuid4().hex[:6]
+        courses = [_course_files(f"Bench {run_id} {n}", args.rows) for n in range(args.courses)]
+        elapsed, requests = run(base, courses)
+        print(f"{label:<9} {args.courses} cours, {4 * args.courses * args.rows} lignes : "
+              f"{elapsed:.1f} s, {requests} requête(s) d'import")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de non-régression : suppression d'un cours volumineux.
+
+Crée un cours de `--rows` pages, puis autant de QCM, textes à trous et jeux de
+classement (imports CSV), et mesure la durée de DELETE /api/cours/{id}.
+Avec la suppression en cascade côté base, la requête ne charge aucune ligne fille :
+la durée ne dépend que du volume supprimé par MySQL. Vérifie aussi qu'aucune ligne
+orpheline ne subsiste.
+
+Usage (API démarrée) :
+    python bench/delete_large_cours.py --url http://localhost:8000 --rows 10000 --repeat 3
+"""
+import argparse
+import statistics
+import time
+import urllib.error
+import uuid
+
+from _client import csv_bytes, request, upload
+
+
+def _seed(base, rows, label):
+    """Crée un cours et tout son contenu, retourne son id"""
+    pages = [f"Page {i};Contenu de la page {i};" for i in range(rows)]
+    job = upload(
+        f"{base}/api/cours/upload",
+        csv_bytes([f"Bench suppression {label};Cours de test;Bench;Module de benchmark"] + pages),
+        "cours.csv", interval=0.5,
+    )
+    cours_id = job["result"]["id"]
+
+    upload(f"{base}/api/qcm/upload/{cours_id}", csv_bytes(["QCM"] + [
+        f"Question {i} ?;A;B;C;D;{i % 4 + 1}" for i in range(rows)
+    ]), "qcm.csv", interval=0.5)
+    upload(f"{base}/api/text-a-true/upload/{cours_id}", csv_bytes(["TAT"] + [
+        f"Le ___ numéro {i};A;B;C;D;{i % 4 + 1}" for i in range(rows)
+    ]), "tat.csv", interval=0.5)
+    upload(f"{base}/api/jeu-classement/upload/{cours_id}", csv_bytes(["JEU"] + [
+        f"Classer {i};A;B;C;D;2<1<4<3;texte" for i in range(rows)
+    ]), "jeu.csv", interval=0.5)
+    return cours_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rows", type=int, default=10000, help="Lignes par table fille")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    base = args.url.rstrip("/")
+
+    durations = []
+    for n in range(args.repeat):
+        cours_id = _seed(base, args.rows, f"{uuid.uuid4().hex[:8]}-{n}")
+
+        start = time.perf_counter()
+        request("DELETE", f"{base}/api/cours/{cours_id}")
+        durations.append((time.perf_counter() - start) * 1000)
+
+        # Vérifier qu'il ne reste rien du cours
+        try:
+            request("GET", f"{base}/api/cours/{cours_id}")
+            raise RuntimeError(f"Le cours {cours_id} existe encore")
+        except urllib.error.HTTPError as e:
+            if e.code != 404:
+                raise
+        for path in ("qcm", "text-a-true", "jeu-classement"):
+            if request("GET", f"{base}/api/{path}/{cours_id}?limit=1")["items"]:
+                raise RuntimeError(f"Lignes orphelines dans /api/{path}/{cours_id}")
+
+        print(f"cours {cours_id} : {4 * args.rows} lignes supprimées en {durations[-1]:.1f} ms")
+
+    print(f"médiane {statistics.median(durations):.1f} ms, max {max(durations):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Test de charge : latence des GET pendant un import CSV concurrent.
+
+Mesure la latence de GET /api/cours (p50 / p99) au repos, puis pendant l'upload
+d'une grosse banque de QCM sur le même worker. Les deux séries doivent rester
+comparables : l'import ne doit pas bloquer la boucle d'événements.
+
+Usage (API démarrée, un cours existant) :
+    python bench/import_latency.py --url http://localhost:8000 --cours-id 1 --rows 50000
+"""
+import argparse
+import statistics
+import threading
+import time
+import urllib.request
+
+from _client import csv_bytes, multipart, percentile, request, wait
+
+
+def _get(url):
+    start = time.perf_counter()
+    with urllib.request.urlopen(url) as res:
+        res.read()
+    return (time.perf_counter() - start) * 1000
+
+
+def _hammer(url, duration, concurrency):
+    """Envoie des GET en boucle pendant `duration` secondes, retourne les latences (ms)"""
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker():
+        while time.monotonic() < deadline:
+            ms = _get(url)
+            with lock:
+                latencies.append(ms)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies
+
+
+def _build_csv(rows):
+    return csv_bytes(["Banque de test"] + [
+        f"Question {i} ?;Réponse A;Réponse B;Réponse C;Réponse D;{i % 4 + 1}" for i in range(rows)
+    ])
+
+
+def _upload(base, cours_id, payload):
+    job = request("POST", f"{base}/api/qcm/upload/{cours_id}", *multipart([("file", "bench.csv", payload)]))
+    # Attendre la fin de l'import en arrière-plan
+    return wait(base, job, interval=0.5)
+
+
+def _report(label, latencies):
+    print(
+        f"{label:<16} n={len(latencies):<6} "
+        f"p50={statistics.median(latencies):7.1f} ms  p99={percentile(latencies, 99):7.1f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--cours-id", type=int, required=True)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    target = f"{args.url}/api/cours?limit=50"
+
+    _report("au repos", _hammer(target, args.duration, args.concurrency))
+
+    payload = _build_csv(args.rows)
+    result = {}
+    uploader = threading.Thread(target=lambda: result.update(_upload(args.url, args.cours_id, payload)))
+    uploader.start()
+    _report("pendant import", _hammer(target, args.duration, args.concurrency))
+    uploader.join()
+
+    print(f"import : {result.get('status')} ({result.get('rows_inserted')} lignes insérées)")
+
+
+if __name__ == "__main__":
+    main()
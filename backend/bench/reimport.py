@@ -0,0 +1,59 @@
+"""
+Benchmark des réimports : un cours de `--rows` pages et un QCM de `--rows` questions importés
+une première fois, puis renvoyés `--repeat` fois à l'identique (lignes ignorées), puis une fois
+avec une ligne sur dix modifiée. Vérifie qu'aucune ligne n'est dupliquée.
+
+Usage (API démarrée, migrations appliquées) :
+    python bench/reimport.py --url http://localhost:8000 --rows 50000 --repeat 3
+"""
+import argparse
+import time
+import uuid
+
+from _client import csv_bytes, request, upload
+
+
+def _files(titre, rows, version):
+    """CSV du cours et du QCM ; `version` change une ligne sur dix"""
+    def suffix(i):
+        return f" v{version}" if version and i % 10 == 0 else ""
+
+    cours = csv_bytes([f"{titre};Cours de test;Module de benchmark;Module créé par le benchmark"]
+                 + [f"Page {i};Contenu {i}{suffix(i)};" for i in range(rows)])
+    qcm = csv_bytes([f"{titre};"] + [f"Question {i} ?;A{suffix(i)};B;C;D;{i % 4 + 1}" for i in range(rows)])
+    return cours, qcm
+
+
+def _run(base, label, cours_csv, qcm_csv, cours_id=None):
+    start = time.perf_counter()
+    job = upload(f"{base}/api/cours/upload", cours_csv)
+    cours_id = job["result"]["id"]
+    qcm = upload(f"{base}/api/qcm/upload/{cours_id}", qcm_csv)
+    elapsed = time.perf_counter() - start
+    counts = {name: job[name] + qcm[name] for name in ("rows_inserted", "rows_updated", "rows_skipped")}
+    print(f"{label:<12} {elapsed:6.2f} s  insérées {counts['rows_inserted']}, "
+          f"modifiées {counts['rows_updated']}, inchangées {counts['rows_skipped']}")
+    return cours_id
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--rows", type=int, default=10000, help="Pages et questions du cours")
+    parser.add_argument("--repeat", type=int, default=3, help="Réimports à l'identique")
+    args = parser.parse_args()
+    base = args.url.rstrip("/")
+    titre = f"Bench réimport {uuid.uuid4().hex[:6]}"
+
+    cours_id = _run(base, "premier", *_files(titre, args.rows, 0))
+    for n in range(args.repeat):
+        _run(base, f"identique {n + 1}", *_files(titre, args.rows, 0))
+    _run(base, "modifié", *_files(titre, args.rows, 1))
+
+    cours = request("GET", f"{base}/api/cours/{cours_id}")
+    if cours["nb_pages"] != args.rows or cours["nb_qcm"] != args.rows:
+        raise SystemExit(f"Doublons : {cours['nb_pages']} pages, {cours['nb_qcm']} questions")
+
+
+if __name__ == "__main__":
+    main()
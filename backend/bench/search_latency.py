@@ -0,0 +1,76 @@
+"""
+Benchmark de la recherche : latence de GET /api/search (p50 / p95 / p99).
+
+Avec `--seed-pages`, crée d'abord des cours de `--pages-per-cours` pages (imports CSV) dont le
+texte est tiré d'un vocabulaire fixe, puis envoie `--requests` recherches de un ou deux mots de
+ce vocabulaire. Lancer l'API avec CACHE_BACKEND=none pour mesurer la base et non le cache.
+Code de sortie 1 si le p95 dépasse `--target-ms`.
+
+Usage (API démarrée sur MySQL, migrations appliquées) :
+    python bench/search_latency.py --url http://localhost:8000 --seed-pages 1000000 --requests 500
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import urllib.parse
+import uuid
+
+from _client import csv_bytes, percentile, request, upload
+
+VOCABULARY = (
+    "photosynthèse chlorophylle énergie lumière cellule membrane noyau molécule atome électron "
+    "réaction équilibre vitesse force gravité orbite planète galaxie climat océan volcan séisme "
+    "érosion rivière montagne forêt espèce évolution fossile génétique protéine enzyme hormone "
+    "neurone mémoire langage grammaire poésie roman théâtre histoire révolution empire république "
+    "démocratie économie monnaie marché commerce industrie machine algorithme programme réseau"
+).split()
+
+
+def _sentence(rng, words):
+    return " ".join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def _seed(base, total, per_cours, rng):
+    created = 0
+    while created < total:
+        count = min(per_cours, total - created)
+        lines = [f"Bench recherche {uuid.uuid4().hex[:8]};Cours de test;Bench;Module de benchmark"]
+        lines += [f"{_sentence(rng, 4)};{_sentence(rng, 40)};" for _ in range(count)]
+        upload(f"{base}/api/cours/upload", csv_bytes(lines), "cours.csv", interval=0.5)
+        created += count
+        print(f"{created}/{total} pages créées")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--seed-pages", type=int, default=0, help="Pages à créer avant la mesure")
+    parser.add_argument("--pages-per-cours", type=int, default=50000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--target-ms", type=float, default=50, help="Objectif de p95")
+    args = parser.parse_args()
+    base = args.url.rstrip("/")
+    rng = random.Random(42)
+
+    if args.seed_pages:
+        _seed(base, args.seed_pages, args.pages_per_cours, rng)
+
+    durations = []
+    for _ in range(args.requests):
+        query = urllib.parse.urlencode({"q": _sentence(rng, rng.choice((1, 2))), "limit": 20})
+        start = time.perf_counter()
+        request("GET", f"{base}/api/search?{query}")
+        durations.append((time.perf_counter() - start) * 1000)
+
+    p95 = percentile(durations, 95)
+    print(
+        f"{len(durations)} recherches : p50 {statistics.median(durations):.1f} ms, "
+        f"p95 {p95:.1f} ms, p99 {percentile(durations, 99):.1f} ms (objectif p95 < {args.target_ms:.0f} ms)"
+    )
+    sys.exit(0 if p95 < args.target_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
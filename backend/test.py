@@ -11,16 +11,14 @@ APP_DIR = os.path.join(PROJECT_ROOT, "app")
 if APP_DIR not in sys.path:
     sys.path.insert(0, APP_DIR)
 
-from app.database import SessionLocal  # type: ignore
+from app.database import SessionLocal, init_engines  # type: ignore
 from app import models  # type: ignore
 
 
 def seed_cours():
+    init_engines()
     db = SessionLocal()
     try:
-        # Ensure tables exist
-        models.Base.metadata.create_all(bind=db.get_bind())
-
         # ── CLEAN SLATE ──────────────────────────────────────────────────────────
         print("Suppression des données existantes…")
         db.query(models.QCM).delete()
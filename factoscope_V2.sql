@@ -17,6 +17,9 @@ SET time_zone = "+00:00";
 --
 -- Base de données : `factoscope`
 --
+-- Schéma de référence, équivalent à la base obtenue par `python -m app.migrate`
+-- (migrations m0001 à m0006). Les migrations restent la source de vérité.
+--
 
 -- --------------------------------------------------------
 
@@ -30,10 +33,18 @@ CREATE TABLE IF NOT EXISTS `cours` (
     `id` int(11) NOT NULL AUTO_INCREMENT,
     `titre` varchar(255) NOT NULL,
     `description` text NOT NULL,
-    `contenu` varchar(255) NOT NULL,
+    `contenu` text NOT NULL,
     `id_module` int(11) DEFAULT NULL,
+    `version` int(11) NOT NULL DEFAULT 0,
+    `updated_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    `nb_pages` int(11) NOT NULL DEFAULT 0,
+    `nb_qcm` int(11) NOT NULL DEFAULT 0,
+    `nb_text_a_trou` int(11) NOT NULL DEFAULT 0,
+    `nb_jeu_classement` int(11) NOT NULL DEFAULT 0,
     PRIMARY KEY (`id`),
-    KEY `id_module` (`id_module`)
+    KEY `id_module` (`id_module`),
+    KEY `ix_cours_titre` (`titre`),
+    FULLTEXT KEY `ft_cours` (`titre`, `description`, `contenu`)
 ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_uca1400_ai_ci;
 
 -- --------------------------------------------------------
@@ -48,7 +59,9 @@ CREATE TABLE IF NOT EXISTS `module` (
     `id` int(11) NOT NULL AUTO_INCREMENT,
     `titre` varchar(255) NOT NULL,
     `description` text NOT NULL,
-    PRIMARY KEY (`id`)
+    `titre_key` varchar(255) NOT NULL,
+    PRIMARY KEY (`id`),
+    UNIQUE KEY `uq_module_titre_key` (`titre_key`)
 ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_uca1400_ai_ci;
 
 -- --------------------------------------------------------
@@ -66,8 +79,12 @@ CREATE TABLE IF NOT EXISTS `page` (
     `medias` text DEFAULT '',
     `est_vue` int(11) DEFAULT 0,
     `id_cours` int(11) NOT NULL,
+    `row_key` varchar(32) DEFAULT NULL,
+    `content_hash` varchar(32) DEFAULT NULL,
     PRIMARY KEY (`id`),
-    KEY `id_cours` (`id_cours`)
+    KEY `ix_page_id_cours_id` (`id_cours`, `id`),
+    UNIQUE KEY `uq_page_id_cours_row_key` (`id_cours`, `row_key`),
+    FULLTEXT KEY `ft_page` (`description`, `content`)
 ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_uca1400_ai_ci;
 
 -- --------------------------------------------------------
@@ -87,10 +104,88 @@ CREATE TABLE IF NOT EXISTS `qcm` (
     `rep4` varchar(255) NOT NULL,
     `soluce` int(11) NOT NULL,
     `id_cours` int(11) NOT NULL,
+    `row_key` varchar(32) DEFAULT NULL,
+    `content_hash` varchar(32) DEFAULT NULL,
+    PRIMARY KEY (`id`),
+    KEY `ix_qcm_id_cours_id` (`id_cours`, `id`),
+    UNIQUE KEY `uq_qcm_id_cours_row_key` (`id_cours`, `row_key`),
+    FULLTEXT KEY `ft_qcm` (`question`, `rep1`, `rep2`, `rep3`, `rep4`)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_uca1400_ai_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Structure de la table `text_a_trou`
+--
+
+DROP TABLE IF EXISTS `text_a_trou`;
+
+CREATE TABLE IF NOT EXISTS `text_a_trou` (
+    `id` int(11) NOT NULL AUTO_INCREMENT,
+    `texte` text NOT NULL,
+    `reponse1` varchar(255) NOT NULL,
+    `reponse2` varchar(255) NOT NULL,
+    `reponse3` varchar(255) NOT NULL,
+    `reponse4` varchar(255) NOT NULL,
+    `soluce` int(11) NOT NULL,
+    `id_cours` int(11) NOT NULL,
+    `row_key` varchar(32) DEFAULT NULL,
+    `content_hash` varchar(32) DEFAULT NULL,
+    PRIMARY KEY (`id`),
+    KEY `ix_text_a_trou_id_cours_id` (`id_cours`, `id`),
+    UNIQUE KEY `uq_text_a_trou_id_cours_row_key` (`id_cours`, `row_key`),
+    FULLTEXT KEY `ft_text_a_trou` (`texte`)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_uca1400_ai_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Structure de la table `jeu_classement`
+--
+
+DROP TABLE IF EXISTS `jeu_classement`;
+
+CREATE TABLE IF NOT EXISTS `jeu_classement` (
+    `id` int(11) NOT NULL AUTO_INCREMENT,
+    `question` text NOT NULL,
+    `element1` varchar(500) NOT NULL,
+    `element2` varchar(500) NOT NULL,
+    `element3` varchar(500) NOT NULL,
+    `element4` varchar(500) NOT NULL,
+    `ordre_solution` varchar(100) NOT NULL,
+    `type_elements` varchar(50) NOT NULL,
+    `id_cours` int(11) NOT NULL,
+    `row_key` varchar(32) DEFAULT NULL,
+    `content_hash` varchar(32) DEFAULT NULL,
     PRIMARY KEY (`id`),
-    KEY `id_cours` (`id_cours`)
+    KEY `ix_jeu_classement_id_cours_id` (`id_cours`, `id`),
+    UNIQUE KEY `uq_jeu_classement_id_cours_row_key` (`id_cours`, `row_key`),
+    FULLTEXT KEY `ft_jeu_classement` (`question`)
+) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_uca1400_ai_ci;
+
+-- --------------------------------------------------------
+
+--
+-- Structure de la table `schema_version` (migrations appliquées)
+--
+
+DROP TABLE IF EXISTS `schema_version`;
+
+CREATE TABLE IF NOT EXISTS `schema_version` (
+    `version` int(11) NOT NULL,
+    `name` varchar(255) NOT NULL,
+    `applied_at` datetime NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (`version`)
 ) ENGINE = InnoDB DEFAULT CHARSET = utf8mb4 COLLATE = utf8mb4_uca1400_ai_ci;
 
+INSERT INTO `schema_version` (`version`, `name`) VALUES
+(1, 'm0001_initial'),
+(2, 'm0002_cours_version_counters'),
+(3, 'm0003_indexes'),
+(4, 'm0004_fulltext'),
+(5, 'm0005_module_titre_key'),
+(6, 'm0006_import_hashes');
+
 --
 -- Contraintes pour les tables déchargées
 --
@@ -113,6 +208,18 @@ ADD CONSTRAINT `page_ibfk_1` FOREIGN KEY (`id_cours`) REFERENCES `cours` (`id`)
 ALTER TABLE `qcm`
 ADD CONSTRAINT `qcm_ibfk_1` FOREIGN KEY (`id_cours`) REFERENCES `cours` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
 
+--
+-- Contraintes pour la table `text_a_trou`
+--
+ALTER TABLE `text_a_trou`
+ADD CONSTRAINT `text_a_trou_ibfk_1` FOREIGN KEY (`id_cours`) REFERENCES `cours` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
+--
+-- Contraintes pour la table `jeu_classement`
+--
+ALTER TABLE `jeu_classement`
+ADD CONSTRAINT `jeu_classement_ibfk_1` FOREIGN KEY (`id_cours`) REFERENCES `cours` (`id`) ON DELETE CASCADE ON UPDATE CASCADE;
+
 COMMIT;
 
 /*!40101 SET CHARACTER_SET_CLIENT=@OLD_CHARACTER_SET_CLIENT */